@@ -18,10 +18,24 @@ Respects DOWNLOAD_VIDEO and SKIP_ALBUMS settings from .env file.
 
 import os
 import sys
+import stat
+import re
+import logging
 import csv
+import time
+import argparse
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from operator import attrgetter
 from dotenv import load_dotenv
 
+try:
+    from rapidfuzz import process, fuzz
+except ImportError:
+    # rapidfuzz is optional; fall back to simple substring matching
+    process = fuzz = None
+
 # Add the current directory to Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
@@ -30,15 +44,59 @@ load_dotenv()
 
 from flickr_downloader.api.client import FlickrAPIClient
 from flickr_downloader import config
-from flickr_downloader.utils.files import sanitize_filename
+from flickr_downloader.utils.files import sanitize_filename, load_json_file, save_json_file
 from flickr_downloader.utils.ui import ProgressSpinner, create_spinner_message
 import flickrapi
 
 
-def get_album_metadata():
-    """Get all album metadata from Flickr using just album list API."""
-    print("🔍 Fetching album metadata from Flickr...")
+logger = logging.getLogger("flickr_album_analysis")
+
+# Emoji and pictographic symbols, stripped from output that is not a terminal
+_EMOJI_RE = re.compile('[\U0001F000-\U0001FFFF\u2300-\u23FF\u2600-\u27BF\u2B00-\u2BFF\uFE0F] ?')
+
+
+class ConsoleFormatter(logging.Formatter):
+    """Formatter that optionally strips emoji, e.g. when output is redirected to a pipe."""
+    
+    def __init__(self, strip_emoji=False):
+        super().__init__('%(message)s')
+        self.strip_emoji = strip_emoji
     
+    def format(self, record):
+        message = super().format(record)
+        if self.strip_emoji:
+            message = _EMOJI_RE.sub('', message)
+        return message
+
+
+def setup_logging():
+    """Send analysis output to stdout through the logging module."""
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(ConsoleFormatter(strip_emoji=not sys.stdout.isatty()))
+    logger.handlers[:] = [handler]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+# Video file extensions (without the leading dot) excluded when DOWNLOAD_VIDEO=false
+VIDEO_EXTS = frozenset({'mp4', 'mov', 'avi', 'webm', 'mkv', 'flv', 'wmv', 'm4v', '3gp'})
+
+# Write buffer for the CSV report, so large reports need few write() syscalls
+CSV_BUFFER_SIZE = 8 * 1024 * 1024
+
+
+@dataclass(slots=True)
+class Album:
+    """Remote album metadata used for the report."""
+    id: str
+    name: str
+    photo_count: int
+    video_count: int
+    remote_count: int
+
+
+def authenticate_flickr():
+    """Initialize and authenticate the Flickr API, returning (flickr, api_client, user_id)."""
     # Initialize Flickr API
     flickr = flickrapi.FlickrAPI(config.API_KEY, config.API_SECRET, format='parsed-json')
     api_client = FlickrAPIClient()
@@ -47,7 +105,7 @@ def get_album_metadata():
     if not flickr.token_valid(perms='read'):
         flickr.get_request_token(oauth_callback='oob')
         authorize_url = flickr.auth_url(perms='read')
-        print(f"Open this URL to authorize: {authorize_url}")
+        logger.info(f"Open this URL to authorize: {authorize_url}")
         verifier = input("Enter the verification code: ")
         flickr.get_access_token(verifier)
 
@@ -55,13 +113,34 @@ def get_album_metadata():
     user_info = api_client.call_with_retries(flickr.test.login)
     user_id = user_info['user']['id']
     
+    return flickr, api_client, user_id
+
+
+def fetch_photosets_cached(flickr, api_client, user_id, refresh=False):
+    """Fetch the album list, reusing a recent on-disk copy unless refresh is requested."""
+    cache_file = config.photosets_cache_file
+    
+    if not refresh and os.path.exists(cache_file):
+        age = time.time() - os.path.getmtime(cache_file)
+        if age < config.PHOTOSET_CACHE_TTL:
+            cached = load_json_file(cache_file)
+            if cached.get('user_id') == user_id:
+                logger.info(f"💾 Using cached album list ({int(age)}s old)")
+                return cached['photosets']
+    
+    photosets = api_client.fetch_photosets(flickr, user_id)
+    save_json_file(cache_file, {'user_id': user_id, 'photosets': photosets})
+    return photosets
+
+
+def get_album_metadata(flickr, api_client, user_id, refresh=False):
+    """Get all album metadata from Flickr using just album list API."""
+    logger.info("🔍 Fetching album metadata from Flickr...")
+    
     # Get all albums with metadata - this includes photo counts!
-    photosets_response = api_client.call_with_retries(
-        flickr.photosets.getList, user_id=user_id
-    )
-    photosets = photosets_response['photosets']['photoset']
+    photosets = fetch_photosets_cached(flickr, api_client, user_id, refresh)
     
-    print(f"📋 Found {len(photosets)} albums on Flickr")
+    logger.info(f"📋 Found {len(photosets)} albums on Flickr")
     
     album_data = []
     skipped_albums = []
@@ -86,58 +165,81 @@ def get_album_metadata():
         else:
             item_count = photo_count  # Only photos
         
-        album_info = {
-            'id': album_id,
-            'name': album_title,
-            'photo_count': photo_count,
-            'video_count': video_count,
-            'remote_count': item_count
-        }
+        album_info = Album(
+            id=album_id,
+            name=album_title,
+            photo_count=photo_count,
+            video_count=video_count,
+            remote_count=item_count
+        )
         
         album_data.append(album_info)
     
     # Show what was skipped
     if skipped_albums:
-        print(f"⏭️ Skipped {len(skipped_albums)} albums: {', '.join(skipped_albums)}")
+        logger.info(f"⏭️ Skipped {len(skipped_albums)} albums: {', '.join(skipped_albums)}")
     
     return album_data
 
 
+def _is_video_name(filename):
+    """Check whether a filename has a video extension."""
+    _, dot, ext = filename.rpartition('.')
+    return bool(dot) and ext.lower() in VIDEO_EXTS
+
+
+def _is_nonempty_file(entry):
+    """Check that a directory entry is a regular, non-empty file using a single stat."""
+    st = entry.stat(follow_symlinks=False)
+    return stat.S_ISREG(st.st_mode) and st.st_size > 0
+
+
+def _count_album_files(album_path):
+    """Count non-empty files in a single album directory."""
+    with os.scandir(album_path) as album_entries:
+        if config.DOWNLOAD_VIDEO:
+            file_count = sum(1 for sub in album_entries if _is_nonempty_file(sub))
+        else:
+            # Check the extension before stat-ing so video files are skipped cheaply
+            file_count = sum(
+                1 for sub in album_entries
+                if not _is_video_name(sub.name) and _is_nonempty_file(sub)
+            )
+    
+    return os.path.basename(album_path), file_count
+
+
 def count_local_files():
     """Count local files in each album directory."""
-    print("📁 Counting local files...")
+    logger.info("📁 Counting local files...")
     
     if not os.path.exists(config.DOWNLOAD_DIR):
-        print(f"⚠️ Download directory not found: {config.DOWNLOAD_DIR}")
+        logger.warning(f"⚠️ Download directory not found: {config.DOWNLOAD_DIR}")
         return {}
     
-    # Define video extensions
-    video_extensions = {'.mp4', '.mov', '.avi', '.webm', '.mkv', '.flv', '.wmv', '.m4v', '.3gp'}
-    
-    local_counts = {}
+    # Collect album folders with a single directory scan
+    with os.scandir(config.DOWNLOAD_DIR) as entries:
+        album_dirs = [entry.path for entry in entries if entry.is_dir(follow_symlinks=False)]
     
-    # Walk through each subdirectory (album folder)
-    for item in os.listdir(config.DOWNLOAD_DIR):
-        item_path = os.path.join(config.DOWNLOAD_DIR, item)
-        if os.path.isdir(item_path):
-            # Count files in this album directory
-            file_count = 0
-            for filename in os.listdir(item_path):
-                file_path = os.path.join(item_path, filename)
-                if os.path.isfile(file_path) and os.path.getsize(file_path) > 0:
-                    # Check if we should exclude videos
-                    if not config.DOWNLOAD_VIDEO:
-                        ext = os.path.splitext(filename)[1].lower()
-                        if ext in video_extensions:
-                            continue  # Skip video files
-                    file_count += 1
-            
-            local_counts[item] = file_count
+    # Album scans are bound by filesystem latency, so overlap them in threads
+    max_workers = min(32, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        local_counts = dict(executor.map(_count_album_files, album_dirs))
     
     return local_counts
 
 
-def find_matching_album(album_name, local_counts):
+def build_local_index(local_counts):
+    """Precompute lowercase lookups of local directory names for album matching."""
+    lower_index = {}
+    local_names = list(local_counts)
+    lower_names = [local_name.lower() for local_name in local_names]
+    for local_lower, local_name in zip(lower_names, local_names):
+        lower_index.setdefault(local_lower, local_name)
+    return lower_index, lower_names, local_names
+
+
+def find_matching_album(album_name, local_counts, lower_index, lower_names, local_names):
     """Find the best matching local directory for an album name."""
     # Try exact match first
     sanitized_name = sanitize_filename(album_name)
@@ -145,95 +247,95 @@ def find_matching_album(album_name, local_counts):
         return sanitized_name, local_counts[sanitized_name]
     
     # Try case-insensitive match
-    for local_name, count in local_counts.items():
-        if local_name.lower() == sanitized_name.lower():
-            return local_name, count
+    sanitized_lower = sanitized_name.lower()
+    local_name = lower_index.get(sanitized_lower)
+    if local_name is not None:
+        return local_name, local_counts[local_name]
+    
+    # Try fuzzy match (tolerates punctuation and spacing differences)
+    if process is not None:
+        match = process.extractOne(sanitized_lower, lower_names, scorer=fuzz.WRatio, score_cutoff=85)
+        if match:
+            local_name = local_names[match[2]]
+            return local_name, local_counts[local_name]
+        return None, 0
     
-    # Try partial match (album name contains local name or vice versa)
-    for local_name, count in local_counts.items():
-        if (sanitized_name.lower() in local_name.lower() or 
-            local_name.lower() in sanitized_name.lower()):
-            return local_name, count
+    # Fallback without rapidfuzz: partial match (album name contains local name or vice versa)
+    for local_lower, local_name in zip(lower_names, local_names):
+        if sanitized_lower in local_lower or local_lower in sanitized_lower:
+            return local_name, local_counts[local_name]
     
     return None, 0
 
 
 def create_csv_report(album_data, local_counts, output_file):
     """Create the CSV report with comparison data."""
-    print(f"📊 Creating CSV report: {output_file}")
+    logger.info(f"📊 Creating CSV report: {output_file}")
     
     # Sort albums by remote count (largest to smallest)
-    album_data.sort(key=lambda x: x['remote_count'], reverse=True)
+    album_data.sort(key=attrgetter('remote_count'), reverse=True)
     
-    # Prepare report data
-    report_rows = []
-    total_remote = 0
+    # Remote totals come straight from album metadata
+    total_remote = sum(album.remote_count for album in album_data)
+    total_photos = sum(album.photo_count for album in album_data)
+    total_videos = sum(album.video_count for album in album_data)
     total_local = 0
-    total_photos = 0
-    total_videos = 0
     used_local_dirs = set()
+    lower_index, lower_names, local_names = build_local_index(local_counts)
     
-    for album in album_data:
-        album_name = album['name']
-        remote_count = album['remote_count']
-        photo_count = album.get('photo_count', 0)
-        video_count = album.get('video_count', 0)
-        
-        # Find matching local directory
-        local_dir, local_count = find_matching_album(album_name, local_counts)
-        if local_dir:
-            used_local_dirs.add(local_dir)
-        
-        # Check for differences
-        flag = "🚩" if remote_count != local_count else ""
-        
-        # Create breakdown info
-        breakdown = f"{photo_count}p"
-        if video_count > 0:
-            breakdown += f"+{video_count}v"
-        
-        report_rows.append([
-            album_name,
-            remote_count,
-            breakdown,
-            local_count,
-            flag
-        ])
-        
-        total_remote += remote_count
-        total_local += local_count
-        total_photos += photo_count
-        total_videos += video_count
-    
-    # Add any local directories that don't match any albums
-    unused_local_dirs = set(local_counts.keys()) - used_local_dirs
-    for local_dir in sorted(unused_local_dirs):
-        local_count = local_counts[local_dir]
-        report_rows.append([
-            f"[LOCAL ONLY] {local_dir}",
-            0,
-            "0p+0v",
-            local_count,
-            "🚩" if local_count > 0 else ""
-        ])
-        total_local += local_count
-    
-    # Write CSV file
-    with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
+    # Write CSV file, streaming rows as they are computed
+    with open(output_file, 'w', newline='', encoding='utf-8', buffering=CSV_BUFFER_SIZE) as csvfile:
         writer = csv.writer(csvfile)
         
         # Header
         writer.writerow(['Album Name', 'Remote Items', 'Breakdown (P+V)', 'Local Items', 'Diff Flag'])
         
         # Data rows
-        for row in report_rows:
-            writer.writerow(row)
+        for album in album_data:
+            album_name = album.name
+            remote_count = album.remote_count
+            photo_count = album.photo_count
+            video_count = album.video_count
+            
+            # Find matching local directory
+            local_dir, local_count = find_matching_album(
+                album_name, local_counts, lower_index, lower_names, local_names
+            )
+            if local_dir:
+                used_local_dirs.add(local_dir)
+            
+            # Check for differences
+            flag = "🚩" if remote_count != local_count else ""
+            
+            # Create breakdown info
+            breakdown = f"{photo_count}p+{video_count}v" if video_count > 0 else f"{photo_count}p"
+            
+            writer.writerow([
+                album_name,
+                remote_count,
+                breakdown,
+                local_count,
+                flag
+            ])
+            
+            total_local += local_count
+        
+        # Add any local directories that don't match any albums
+        unused_local_dirs = local_counts.keys() - used_local_dirs
+        for local_dir in sorted(unused_local_dirs):
+            local_count = local_counts[local_dir]
+            writer.writerow([
+                f"[LOCAL ONLY] {local_dir}",
+                0,
+                "0p+0v",
+                local_count,
+                "🚩" if local_count > 0 else ""
+            ])
+            total_local += local_count
         
         # Total row
         total_flag = "🚩" if total_remote != total_local else ""
-        total_breakdown = f"{total_photos}p"
-        if total_videos > 0:
-            total_breakdown += f"+{total_videos}v"
+        total_breakdown = f"{total_photos}p+{total_videos}v" if total_videos > 0 else f"{total_photos}p"
         
         writer.writerow([
             'TOTAL',
@@ -243,34 +345,57 @@ def create_csv_report(album_data, local_counts, output_file):
             total_flag
         ])
     
-    print(f"✅ Report saved to: {output_file}")
-    print(f"📊 Summary: {total_remote:,} remote items ({total_photos:,} photos, {total_videos:,} videos), {total_local:,} local items")
+    logger.info(f"✅ Report saved to: {output_file}")
+    logger.info(f"📊 Summary: {total_remote:,} remote items ({total_photos:,} photos, {total_videos:,} videos), {total_local:,} local items")
     if total_remote != total_local:
         diff = abs(total_remote - total_local)
-        print(f"⚠️ Difference: {diff:,} items")
+        logger.warning(f"⚠️ Difference: {diff:,} items")
     else:
-        print("✅ Perfect match!")
+        logger.info("✅ Perfect match!")
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Compare Flickr album metadata with local files and write a CSV report"
+    )
+    parser.add_argument(
+        '--refresh',
+        action='store_true',
+        help='Ignore the cached album list and fetch it from Flickr again.'
+    )
+    return parser.parse_args()
 
 
 def main():
     """Main function to run the album analysis."""
+    args = parse_arguments()
+    setup_logging()
+    
     try:
-        print("🚀 Starting Flickr Album Analysis")
-        print("=" * 50)
+        logger.info("🚀 Starting Flickr Album Analysis")
+        logger.info("=" * 50)
         
         # Check if videos are included
         video_status = "✅ Included" if config.DOWNLOAD_VIDEO else "❌ Excluded"
-        print(f"📹 Video files: {video_status}")
-        print(f"📂 Download directory: {config.DOWNLOAD_DIR}")
-        print("")
+        logger.info(f"📹 Video files: {video_status}")
+        logger.info(f"📂 Download directory: {config.DOWNLOAD_DIR}")
+        logger.info("")
+        
+        # Authenticate up front so the interactive prompt stays on the main thread
+        flickr, api_client, user_id = authenticate_flickr()
         
-        # Get album metadata from Flickr
-        album_data = get_album_metadata()
-        print(f"📋 Found {len(album_data)} albums on Flickr")
+        # Fetch album metadata from Flickr and count local files concurrently
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            remote_future = executor.submit(
+                get_album_metadata, flickr, api_client, user_id, args.refresh
+            )
+            local_future = executor.submit(count_local_files)
+            album_data = remote_future.result()
+            local_counts = local_future.result()
         
-        # Count local files
-        local_counts = count_local_files()
-        print(f"📁 Found {len(local_counts)} local directories")
+        logger.info(f"📋 Found {len(album_data)} albums on Flickr")
+        logger.info(f"📁 Found {len(local_counts)} local directories")
         
         # Create output filename
         video_suffix = "_with_videos" if config.DOWNLOAD_VIDEO else "_photos_only"
@@ -279,15 +404,13 @@ def main():
         # Generate report
         create_csv_report(album_data, local_counts, output_file)
         
-        print("=" * 50)
-        print("🎉 Analysis completed successfully!")
+        logger.info("=" * 50)
+        logger.info("🎉 Analysis completed successfully!")
         
     except KeyboardInterrupt:
-        print("\n⚠️ Analysis interrupted by user")
+        logger.warning("\n⚠️ Analysis interrupted by user")
     except Exception as e:
-        print(f"❌ Error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"❌ Error: {e}")
 
 
 if __name__ == "__main__":
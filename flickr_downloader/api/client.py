@@ -3,242 +3,409 @@ Flickr API client with retry logic and rate limiting.
 Handles all communication with the Flickr API.
 """
 import time
+import random
 import flickrapi
 from threading import Lock
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException, Timeout
 
 from ..config import config
 from ..utils.ui import print_and_log
-from ..utils.files import format_file_size, save_json_file
+from ..utils.files import format_file_size, load_json_file, save_json_file, sanitize_filename
+
+
+# A downloadable size of a photo or video, as returned by flickr.photos.getSizes
+Candidate = namedtuple('Candidate', 'url label width height resolution file_size is_original')
+
+
+# Photo listing fields kept in the album scan cache
+SCAN_CACHE_FIELDS = ('id', 'title', 'media', 'url_o', 'width_o', 'height_o')
+
+
+class TokenBucket:
+    """Thread-safe token bucket that spaces out calls to an adaptive rate.
+    
+    The lock only guards the token accounting; callers sleep for their slot
+    outside of it, so waiting threads never block each other's API calls.
+    The rate follows AIMD: it creeps back up towards 1/min_interval after each
+    success and halves whenever the server signals that it is overloaded.
+    """
+    
+    RATE_INCREASE = 0.05  # calls per second added after each success
+    RATE_DECREASE = 0.5   # factor applied to the rate when throttled
+    MAX_INTERVAL = 30.0   # slowest spacing the bucket backs off to
+    
+    def __init__(self, interval, capacity=1):
+        self.min_interval = interval
+        self.interval = interval
+        self.capacity = capacity
+        self.lock = Lock()
+        self.next_allowed = time.monotonic()
+    
+    def acquire(self):
+        """Block until a token is available."""
+        with self.lock:
+            now = time.monotonic()
+            # Allow at most `capacity` tokens to accumulate while idle
+            earliest = now - (self.capacity - 1) * self.interval
+            if self.next_allowed < earliest:
+                self.next_allowed = earliest
+            wait = self.next_allowed - now
+            self.next_allowed += self.interval
+        
+        if wait > 0:
+            time.sleep(wait)
+    
+    def increase_rate(self):
+        """Additively raise the rate after a successful call, up to the configured limit."""
+        with self.lock:
+            if self.interval > self.min_interval:
+                self.interval = max(self.min_interval, 1 / (1 / self.interval + self.RATE_INCREASE))
+    
+    def decrease_rate(self):
+        """Multiplicatively lower the rate after the server pushed back."""
+        with self.lock:
+            self.interval = min(max(self.interval, 0.1) / self.RATE_DECREASE, self.MAX_INTERVAL)
+    
+    def load_state(self, filepath):
+        """Resume from the rate saved by a previous run so a throttled account doesn't start at full speed."""
+        interval = load_json_file(filepath).get('interval')
+        if isinstance(interval, (int, float)):
+            with self.lock:
+                self.interval = min(max(interval, self.min_interval), self.MAX_INTERVAL)
+    
+    def save_state(self, filepath):
+        """Persist the current rate for the next run."""
+        save_json_file(filepath, {'interval': self.interval})
 
 
 class FlickrAPIClient:
     """Wrapper for Flickr API with retry logic and rate limiting."""
     
     def __init__(self):
-        self.api_lock = Lock()
-        self.last_call_time = None
+        self.rate_limiter = TokenBucket(config.API_CALL_DELAY)
+        # Original photo URLs seen in album listings, keyed by photo ID
+        self.listing_urls = {}
+        # Download info looked up during this run, keyed by photo ID; None means nothing to download
+        self.resolved = {}
+        
+    def configure_session(self, flickr):
+        """Size the keep-alive connection pool used for API calls to the number of concurrent callers."""
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=max(10, config.MAX_WORKERS * 2),
+            max_retries=0
+        )
+        # flickrapi sends every request through one requests.Session
+        flickr.flickr_oauth.session.mount('https://', adapter)
         
     def call_with_retries(self, func, *args, **kwargs):
         """Make a Flickr API call with retry logic and rate limiting."""
         backoff = config.INITIAL_BACKOFF
         
+        # Add timeout parameter to all API calls
+        if 'timeout' not in kwargs:
+            kwargs['timeout'] = 120  # Increase timeout to 120 seconds
+        
         for attempt in range(1, config.MAX_RETRIES + 1):
             try:
-                with self.api_lock:
-                    # Rate limiting delay
-                    if self.last_call_time:
-                        elapsed = time.time() - self.last_call_time
-                        if elapsed < config.API_CALL_DELAY:
-                            time.sleep(config.API_CALL_DELAY - elapsed)
-                            
-                    # Add timeout parameter to all API calls
-                    if 'timeout' not in kwargs:
-                        kwargs['timeout'] = 120  # Increase timeout to 120 seconds
-                        
-                    result = func(*args, **kwargs)
-                    self.last_call_time = time.time()
+                # Rate limiting: wait for our slot without holding a lock during the call
+                self.rate_limiter.acquire()
+                result = func(*args, **kwargs)
+                self.rate_limiter.increase_rate()
                 return result
                 
             except flickrapi.exceptions.FlickrError as e:
                 code = getattr(e, 'code', None)
                 if code in [429, 503]:  # rate limit or server busy
-                    print(f"⚠️ API rate limit hit or server busy, retry {attempt}/{config.MAX_RETRIES} after {backoff}s...")
+                    # Slow every caller down, not just this retry
+                    self.rate_limiter.decrease_rate()
+                    print_and_log(f"⚠️ API rate limit hit or server busy, retry {attempt}/{config.MAX_RETRIES} after {backoff}s...", "WARNING")
                 elif code:
-                    print(f"⚠️ Flickr API status code: {code}, retry {attempt}/{config.MAX_RETRIES} after {backoff}s...")
+                    print_and_log(f"⚠️ Flickr API status code: {code}, retry {attempt}/{config.MAX_RETRIES} after {backoff}s...", "WARNING")
                 else:
-                    print(f"⚠️ Flickr API error: {str(e)}, retry {attempt}/{config.MAX_RETRIES} after {backoff}s...")
+                    print_and_log(f"⚠️ Flickr API error: {str(e)}, retry {attempt}/{config.MAX_RETRIES} after {backoff}s...", "WARNING")
                     
             except (RequestException, Timeout) as e:
-                print(f"⚠️ Network error: {e}, retry {attempt}/{config.MAX_RETRIES} after {backoff}s...")
+                if isinstance(e, Timeout):
+                    self.rate_limiter.decrease_rate()
+                print_and_log(f"⚠️ Network error: {e}, retry {attempt}/{config.MAX_RETRIES} after {backoff}s...", "WARNING")
                 # For network errors, use a longer backoff
                 backoff = min(backoff * 2.5, config.MAX_BACKOFF)
                 continue
 
-            time.sleep(backoff)
+            # Jitter the backoff so concurrent workers don't retry in lockstep
+            time.sleep(backoff * (0.5 + random.random()))
             backoff = min(backoff * 2, config.MAX_BACKOFF)
 
         raise RuntimeError(f"API call failed after {config.MAX_RETRIES} retries.")
 
-    def fetch_album_photos(self, flickr, album_id, user_id):
-        """Fetch all photos from an album with pagination, respecting video download settings."""
-        page = 1
-        album_photos = []
+    def fetch_photosets(self, flickr, user_id):
+        """Fetch all albums (photosets) for a user, requesting remaining pages concurrently."""
+        photosets_data = self.call_with_retries(
+            flickr.photosets.getList,
+            user_id=user_id,
+            per_page=500,
+            page=1
+        )['photosets']
+        photosets = list(photosets_data['photoset'])
+        pages = int(photosets_data.get('pages', 1))
+        
+        if pages > 1:
+            def fetch_page(page):
+                return self.call_with_retries(
+                    flickr.photosets.getList,
+                    user_id=user_id,
+                    per_page=500,
+                    page=page
+                )['photosets']['photoset']
+            
+            with ThreadPoolExecutor(max_workers=min(8, pages - 1)) as executor:
+                for page_photosets in executor.map(fetch_page, range(2, pages + 1)):
+                    photosets.extend(page_photosets)
         
-        while True:
-            photos_data = self.call_with_retries(
+        return photosets
+
+    def fetch_album_photos(self, flickr, album_id, user_id):
+        """Fetch all photos from an album, requesting remaining pages concurrently and respecting video download settings."""
+        def fetch_page(page):
+            return self.call_with_retries(
                 flickr.photosets.getPhotos,
                 photoset_id=album_id,
                 user_id=user_id,
-                extras="url_o,media",
+                extras="url_o,media,o_dims",
                 per_page=500,
                 page=page
             )['photoset']
+        
+        photos_data = fetch_page(1)
+        pages = [photos_data['photo']]
+        page_count = int(photos_data.get('pages', 1))
+        
+        if page_count > 1:
+            # Pages are still spaced by the shared rate limiter; their latency overlaps
+            with ThreadPoolExecutor(max_workers=min(8, page_count - 1)) as executor:
+                for page_data in executor.map(fetch_page, range(2, page_count + 1)):
+                    pages.append(page_data['photo'])
+        
+        album_photos = []
+        for page_photos in pages:
+            self._remember_listing_urls(page_photos)
 
             # Filter out videos if video downloads are disabled
             if config.DOWNLOAD_VIDEO:
-                album_photos.extend(photos_data['photo'])
+                album_photos.extend(page_photos)
             else:
                 # Only include photos, skip videos
-                for photo in photos_data['photo']:
+                for photo in page_photos:
                     media_type = photo.get('media', 'photo')
                     if media_type == 'photo':
                         album_photos.append(photo)
-            
-            if page >= photos_data['pages']:
-                break
-            page += 1
         
         return album_photos
 
+    def fetch_album_photos_cached(self, flickr, photoset, user_id, scan_cache):
+        """Fetch all photos from an album, reusing the previous scan if the album is unchanged.
+        
+        Albums are matched on the photoset's date_update from photosets.getList.
+        """
+        album_id = photoset['id']
+        date_update = photoset.get('date_update')
+        
+        cached = scan_cache.get(album_id)
+        if (date_update and cached and cached.get('date_update') == date_update
+                and cached.get('download_video') == config.DOWNLOAD_VIDEO):
+            self._remember_listing_urls(cached['photos'])
+            return cached['photos']
+        
+        album_photos = self.fetch_album_photos(flickr, album_id, user_id)
+        
+        if date_update:
+            scan_cache.set(album_id, {
+                'date_update': date_update,
+                'download_video': config.DOWNLOAD_VIDEO,
+                'photos': [
+                    {key: photo[key] for key in SCAN_CACHE_FIELDS if key in photo}
+                    for photo in album_photos
+                ]
+            })
+        return album_photos
+
+    def _remember_listing_urls(self, photos):
+        """Record original URLs returned by listing extras so photos need no getInfo/getSizes calls."""
+        for photo in photos:
+            # Listings only carry a still image URL for videos, so they still use getSizes
+            if photo.get('media', 'photo') == 'photo' and photo.get('url_o'):
+                selected_info = f"Original ({photo.get('width_o', 0)}x{photo.get('height_o', 0)})"
+                self.listing_urls[photo['id']] = {
+                    'url': photo['url_o'],
+                    'media_type': 'photo',
+                    'selected_info': selected_info
+                }
+
     def fetch_unsorted_photos(self, flickr, user_id, all_album_photo_ids):
         """Fetch all unsorted photos (not in any album) with pagination."""
-        page = 1
         unsorted_photo_ids = []
+        for page_photo_ids in self.iter_unsorted_photos(flickr, user_id, all_album_photo_ids):
+            unsorted_photo_ids.extend(page_photo_ids)
+        return unsorted_photo_ids
+
+    def iter_unsorted_photos(self, flickr, user_id, all_album_photo_ids):
+        """Yield the unsorted photos (not in any album) of each photostream page as (id, title) lists."""
+        
+        # Membership is checked for every photo in the stream, so it must be a hash lookup
+        if not isinstance(all_album_photo_ids, (set, frozenset)):
+            all_album_photo_ids = set(all_album_photo_ids)
         
-        while True:
-            photos_data = self.call_with_retries(
+        for photos in self._iter_photostream_pages(flickr, user_id):
+            self._remember_listing_urls(photos)
+            yield [
+                (photo['id'], sanitize_filename(photo['title'] or photo['id']))
+                for photo in photos
+                if photo['id'] not in all_album_photo_ids
+            ]
+
+    def _iter_photostream_pages(self, flickr, user_id):
+        """Yield each page of the user's photostream, fetching the next page in the background."""
+        def fetch_page(page):
+            return self.call_with_retries(
                 flickr.people.getPhotos,
                 user_id=user_id,
                 privacy_filter=1,
                 media="all",
+                extras="url_o,media,o_dims",
+                per_page=500,
                 page=page
             )['photos']
-
-            for photo in photos_data['photo']:
-                pid = photo['id']
-                if pid not in all_album_photo_ids:
-                    from ..utils.files import sanitize_filename
-                    title = sanitize_filename(photo['title'] or pid)
-                    unsorted_photo_ids.append((pid, title))
-
-            if page >= photos_data['pages']:
-                break
-            page += 1
         
-        return unsorted_photo_ids
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            page = 1
+            photos_data = fetch_page(page)
+            while True:
+                # Request the next page before the caller works through this one
+                next_future = None
+                if page < photos_data['pages']:
+                    next_future = executor.submit(fetch_page, page + 1)
+                
+                yield photos_data['photo']
+                
+                if next_future is None:
+                    break
+                photos_data = next_future.result()
+                page += 1
 
     def get_original_url_and_info(self, flickr, photo_id, url_cache):
         """Get the best quality URL and info for a photo or video."""
+        # Photos seen earlier in this run need neither a cache read nor an API call
+        if photo_id in self.resolved:
+            return self.resolved[photo_id]
+        
         # Check cache first
         cache_key = f"{photo_id}_info"
-        if cache_key in url_cache:
-            return url_cache[cache_key]
+        cached = url_cache.get(cache_key)
+        if cached is not None:
+            self.resolved[photo_id] = cached
+            return cached
+
+        # Use the original URL from the album listing when available
+        listing_info = self.listing_urls.get(photo_id)
+        if listing_info:
+            print_and_log(f"    📷 Selected image quality: {listing_info['selected_info']}", "DEBUG")
+            url_cache.set(cache_key, listing_info)
+            self.resolved[photo_id] = listing_info
+            return listing_info
 
-        # Get photo info to determine media type
-        photo_info = self.call_with_retries(flickr.photos.getInfo, photo_id=photo_id)['photo']
-        media_type = photo_info.get('media', 'photo')  # 'photo' or 'video'
-        
-        if media_type == 'video' and not config.DOWNLOAD_VIDEO:
-            # Skip video downloads if disabled
-            return None
-        
-        original_url = None
-        selected_info = None
-        
         try:
             # Get all available sizes
             sizes = self.call_with_retries(flickr.photos.getSizes, photo_id=photo_id)['sizes']['size']
-            
-            if media_type == 'video':
-                original_url, selected_info = self._select_best_video(sizes, photo_id)
-            else:
-                original_url, selected_info = self._select_best_photo(sizes, photo_id)
-
         except Exception as e:
             print_and_log(f"  ❌ Error getting sizes for {photo_id}: {e}", "ERROR")
             return None
+        
+        # Sizes carry the media type, so getInfo is only needed when they don't
+        media_type = self._media_type_from_sizes(sizes)
+        if media_type is None:
+            photo_info = self.call_with_retries(flickr.photos.getInfo, photo_id=photo_id)['photo']
+            media_type = photo_info.get('media', 'photo')  # 'photo' or 'video'
+        
+        if media_type == 'video' and not config.DOWNLOAD_VIDEO:
+            # Skip video downloads if disabled
+            self.resolved[photo_id] = None
+            return None
+        
+        if media_type == 'video':
+            original_url, selected_info = self._select_best_video(sizes, photo_id)
+        else:
+            original_url, selected_info = self._select_best_photo(sizes, photo_id)
 
         if not original_url:
+            self.resolved[photo_id] = None
             return None
 
-        # Cache and save immediately
+        # Cache the result
         result = {'url': original_url, 'media_type': media_type, 'selected_info': selected_info}
-        url_cache[cache_key] = result
-        save_json_file(config.url_cache_file, url_cache)
+        url_cache.set(cache_key, result)
+        self.resolved[photo_id] = result
         return result
 
+    def _media_type_from_sizes(self, sizes):
+        """Get 'photo' or 'video' from a getSizes response, or None if it doesn't say."""
+        media_types = {s.get('media') for s in sizes}
+        if 'video' in media_types:
+            return 'video'
+        if 'photo' in media_types:
+            return 'photo'
+        return None
+
     def _select_best_video(self, sizes, photo_id):
         """Select the best video quality from available sizes."""
-        video_candidates = []
-        for s in sizes:
-            if '/play/' in s['source'] or 'video' in s['label'].lower():
-                resolution = int(s.get('width', 0)) * int(s.get('height', 0))
-                file_size = int(s.get('size', 0))  # File size in bytes
-                video_candidates.append({
-                    'url': s['source'],
-                    'label': s['label'],
-                    'width': int(s.get('width', 0)),
-                    'height': int(s.get('height', 0)),
-                    'resolution': resolution,
-                    'file_size': file_size,
-                    'is_original': s['label'].lower() == 'original'
-                })
-        
-        if video_candidates:
-            # Sort by: 1) original flag, 2) resolution, 3) file size (all descending)
-            video_candidates.sort(key=lambda x: (x['is_original'], x['resolution'], x['file_size']), reverse=True)
-            
-            # Log all candidates for transparency (debug level)
-            if len(video_candidates) > 1:
-                print_and_log(f"    📊 Video quality candidates for {photo_id}:", "DEBUG")
-                for i, candidate in enumerate(video_candidates):
-                    marker = "👑" if i == 0 else "  "
-                    size_info = format_file_size(candidate['file_size'])
-                    print_and_log(f"      {marker} {candidate['label']} ({candidate['width']}x{candidate['height']}){size_info}", "DEBUG")
-            
-            best_video = video_candidates[0]
-            original_url = best_video['url']
-            
-            # Include file size in selection info if available
-            size_info = format_file_size(best_video['file_size'])
-            selected_info = f"{best_video['label']} ({best_video['width']}x{best_video['height']}){size_info}"                
-                
-            print_and_log(f"    🎬 Selected video quality: {selected_info}")
-            return original_url, selected_info
-        else:
-            print_and_log(f"    ❌ No video URLs found for {photo_id}", "ERROR")
-            return None, None
+        return self._select_best(sizes, photo_id, want_video=True)
 
     def _select_best_photo(self, sizes, photo_id):
         """Select the best photo quality from available sizes."""
-        photo_candidates = []
+        return self._select_best(sizes, photo_id, want_video=False)
+
+    def _select_best(self, sizes, photo_id, want_video):
+        """Select the best size of the requested media kind, returning (url, selected_info)."""
+        kind = "Video" if want_video else "Image"
+        candidates = []
         for s in sizes:
-            # Skip video-specific URLs for photos
-            if '/play/' not in s['source'] and 'video' not in s['label'].lower():
-                resolution = int(s.get('width', 0)) * int(s.get('height', 0))
-                file_size = int(s.get('size', 0))  # File size in bytes
-                photo_candidates.append({
-                    'url': s['source'],
-                    'label': s['label'],
-                    'width': int(s.get('width', 0)),
-                    'height': int(s.get('height', 0)),
-                    'resolution': resolution,
-                    'file_size': file_size,
-                    'is_original': s['label'].lower() == 'original'
-                })
-        
-        if photo_candidates:
-            # Sort by: 1) original flag, 2) resolution, 3) file size (all descending)
-            photo_candidates.sort(key=lambda x: (x['is_original'], x['resolution'], x['file_size']), reverse=True)
-            
-            # Log all candidates for transparency (debug level)
-            if len(photo_candidates) > 1:
-                print_and_log(f"    📊 Image quality candidates for {photo_id}:", "DEBUG")
-                for i, candidate in enumerate(photo_candidates):
-                    marker = "👑" if i == 0 else "  "
-                    size_info = format_file_size(candidate['file_size'])
-                    print_and_log(f"      {marker} {candidate['label']} ({candidate['width']}x{candidate['height']}){size_info}", "DEBUG")
-            
-            best_photo = photo_candidates[0]
-            original_url = best_photo['url']
-            
-            # Include file size in selection info if available
-            size_info = format_file_size(best_photo['file_size'])
-            selected_info = f"{best_photo['label']} ({best_photo['width']}x{best_photo['height']}){size_info}"
-            
-            print_and_log(f"    📷 Selected image quality: {selected_info}")
-            return original_url, selected_info
-        else:
-            print_and_log(f"    ❌ No image URLs found for {photo_id}", "ERROR")
+            # Video-specific URLs are only candidates for videos, never for photos
+            is_video_size = '/play/' in s['source'] or 'video' in s['label'].lower()
+            if is_video_size == want_video:
+                width = int(s.get('width', 0))
+                height = int(s.get('height', 0))
+                candidates.append(Candidate(
+                    url=s['source'],
+                    label=s['label'],
+                    width=width,
+                    height=height,
+                    resolution=width * height,
+                    file_size=int(s.get('size', 0)),  # File size in bytes
+                    is_original=s['label'].lower() == 'original'
+                ))
+        
+        if not candidates:
+            print_and_log(f"    ❌ No {kind.lower()} URLs found for {photo_id}", "ERROR")
             return None, None
+        
+        # Prefer: 1) original flag, 2) resolution, 3) file size
+        best = max(candidates, key=lambda c: (c.is_original, c.resolution, c.file_size))
+        
+        # Log all candidates for transparency (debug level)
+        if len(candidates) > 1:
+            print_and_log(f"    📊 {kind} quality candidates for {photo_id}:", "DEBUG")
+            for candidate in candidates:
+                marker = "👑" if candidate is best else "  "
+                size_info = format_file_size(candidate.file_size)
+                print_and_log(f"      {marker} {candidate.label} ({candidate.width}x{candidate.height}){size_info}", "DEBUG")
+        
+        # Include file size in selection info if available
+        size_info = format_file_size(best.file_size)
+        selected_info = f"{best.label} ({best.width}x{best.height}){size_info}"
+        
+        icon = "🎬" if want_video else "📷"
+        print_and_log(f"    {icon} Selected {kind.lower()} quality: {selected_info}", "DEBUG")
+        return best.url, selected_info
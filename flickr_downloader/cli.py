@@ -16,6 +16,7 @@ Examples:
   %(prog)s                           # Download all albums
   %(prog)s --album "Vacation 2023"   # Download only the "Vacation 2023" album
   %(prog)s --album "Trip*"           # Download albums starting with "Trip"
+  %(prog)s --unsorted                # Also download media that is not in any album
         """
     )
     
@@ -26,6 +27,20 @@ Examples:
              'If not specified, all albums will be downloaded.'
     )
     
+    parser.add_argument(
+        '--num-threads', '-n',
+        type=int,
+        default=3,
+        help='Number of albums to download concurrently (default: 3). '
+             'Each album still uses DOWNLOAD_WORKERS parallel file downloads.'
+    )
+    
+    parser.add_argument(
+        '--unsorted', '-u',
+        action='store_true',
+        help='Also download media that is not in any album into an "Unsorted" folder.'
+    )
+    
     return parser.parse_args()
 
 
@@ -4,11 +4,15 @@ Centralizes all configuration settings and environment variables.
 """
 import os
 import json
+from functools import cached_property
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Names of Flickr's Auto Upload album, which is always skipped
+AUTO_UPLOAD_ALBUM_NAMES = frozenset({'auto upload', 'auto-upload', 'autoupload'})
+
 class Config:
     """Configuration settings for the Flickr downloader."""
     
@@ -19,6 +23,9 @@ class Config:
     # Download settings
     DOWNLOAD_VIDEO = os.getenv("DOWNLOAD_VIDEO", "true").lower() == "true"
     
+    # Lowest level of messages shown on the console; the log file always gets everything
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+    
     # Album filtering settings
     @property
     def SKIP_ALBUMS(self):
@@ -42,12 +49,36 @@ class Config:
     def progress_file(self):
         return os.path.join(self.CACHE_DIR, "progress.json")
     
+    @property
+    def progress_log_file(self):
+        return os.path.join(self.CACHE_DIR, "progress.log")
+    
+    @property
+    def cache_db_file(self):
+        return os.path.join(self.CACHE_DIR, "cache.db")
+    
+    @property
+    def scan_cache_file(self):
+        return os.path.join(self.CACHE_DIR, "scan_cache.json")
+    
+    @property
+    def rate_file(self):
+        return os.path.join(self.CACHE_DIR, "rate.json")
+    
+    @property
+    def photosets_cache_file(self):
+        return os.path.join(self.CACHE_DIR, "photosets.json")
+    
+    # Seconds a cached album list stays valid for the album analysis script
+    PHOTOSET_CACHE_TTL = int(os.getenv("PHOTOSET_CACHE_TTL", 600))
+    
     @property
     def log_file(self):
         return os.path.join(self.CACHE_DIR, "flickr_downloader.log")
     
     # Performance settings
-    MAX_WORKERS = int(os.getenv("MAX_WORKERS", 8))
+    MAX_WORKERS = int(os.getenv("MAX_WORKERS", 8))  # Concurrent API lookups (still rate limited)
+    DOWNLOAD_WORKERS = int(os.getenv("DOWNLOAD_WORKERS", 32))  # Concurrent file transfers per album
     API_CALL_DELAY = float(os.getenv("API_CALL_DELAY", 1.1))
     
     # Retry/backoff settings
@@ -62,33 +93,24 @@ class Config:
         
         if self.MAX_WORKERS < 1:
             raise ValueError("MAX_WORKERS must be at least 1")
+        
+        if self.DOWNLOAD_WORKERS < 1:
+            raise ValueError("DOWNLOAD_WORKERS must be at least 1")
             
         if self.API_CALL_DELAY < 0:
             raise ValueError("API_CALL_DELAY must be non-negative")
     
+    @cached_property
+    def skipped_album_names(self):
+        """Lowercased names of all albums to skip, built once from SKIP_ALBUMS."""
+        return AUTO_UPLOAD_ALBUM_NAMES | {name.lower().strip() for name in self.SKIP_ALBUMS}
+    
     def should_skip_album(self, album_name):
-        """Check if an album should be skipped based on SKIP_ALBUMS configuration."""
-        album_lower = album_name.lower().strip()
-        
-        # Always skip Auto Upload album (regardless of SKIP_ALBUMS configuration)
-        if album_lower in ['auto upload', 'auto-upload', 'autoupload']:
-            return True
-        
-        # Check additional albums from SKIP_ALBUMS configuration
-        skip_albums = self.SKIP_ALBUMS
-        
-        for skip_album in skip_albums:
-            skip_lower = skip_album.lower().strip()
-            
-            # Skip Auto Upload variations (redundant but explicit)
-            if skip_lower in ['auto upload', 'auto-upload', 'autoupload']:
-                continue  # Already handled above
-            else:
-                # Exact match for other albums
-                if album_lower == skip_lower:
-                    return True
+        """Check if an album should be skipped based on SKIP_ALBUMS configuration.
         
-        return False
+        The Auto Upload album is always skipped; other names must match exactly (case-insensitive).
+        """
+        return album_name.lower().strip() in self.skipped_album_names
 
 # Global configuration instance
 config = Config()
@@ -3,53 +3,187 @@ Download manager for the Flickr downloader.
 Handles file downloads, concurrent processing, and progress tracking.
 """
 import os
+import shutil
 import requests
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from email.utils import parsedate_to_datetime
+from requests.adapters import HTTPAdapter
+import queue
+from threading import Event, Lock, Thread
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import asyncio
+    import aiohttp
+except ImportError:
+    # aiohttp is optional; downloads fall back to the thread pool
+    aiohttp = None
 
 from ..config import config
 from ..utils.ui import print_and_log
-from ..utils.files import sanitize_filename, save_json_file
+from ..utils.files import VIDEO_EXTENSIONS, IMAGE_EXTENSIONS, PARTIAL_SUFFIX
+
+# Chunk and file buffer size used when streaming downloads to disk
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def _mount_pool(session, concurrent_albums):
+    """Mount an adapter whose pool keeps a connection for every concurrent download worker."""
+    adapter = HTTPAdapter(
+        pool_connections=config.MAX_WORKERS,
+        pool_maxsize=config.DOWNLOAD_WORKERS * concurrent_albums,
+        max_retries=0
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+
+def _create_session():
+    """Create an HTTP session whose connection pool is shared by all download workers."""
+    session = requests.Session()
+    _mount_pool(session, 1)
+    # Media files are already compressed, skip gzip negotiation
+    session.headers['Accept-Encoding'] = 'identity'
+    return session
+
+
+# Shared session so keep-alive connections to Flickr's CDN are reused across downloads
+SESSION = _create_session()
+
+
+def set_concurrent_albums(concurrent_albums):
+    """Resize the shared session's pool for several albums downloading at once.
+    
+    Without this, workers beyond the pool size open a fresh connection for
+    each file and it is discarded afterwards instead of kept alive.
+    """
+    _mount_pool(SESSION, max(1, concurrent_albums))
+
+
+# File extension for each response content type we know how to name
+_CONTENT_TYPE_EXTENSIONS = {
+    'video/mp4': '.mp4',
+    'video/quicktime': '.mov',
+    'image/jpeg': '.jpg',
+    'image/jpg': '.jpg',
+    'image/png': '.png',
+    'image/gif': '.gif',
+}
+
+
+def _correct_extension(filepath, content_type, media_type):
+    """Return filepath with its extension matching the response content type."""
+    mime_type = content_type.split(';', 1)[0].strip().lower()
+    known_ext = _CONTENT_TYPE_EXTENSIONS.get(mime_type)
+    
+    if media_type == 'video' or mime_type.startswith('video/'):
+        # Default for videos
+        correct_ext = known_ext if known_ext in ('.mp4', '.mov') else '.mp4'
+    else:
+        # Default for images and unknown content
+        correct_ext = known_ext or '.jpg'
+    
+    # Update filepath if extension needs correction
+    base_path, current_ext = os.path.splitext(filepath)
+    if current_ext.lower() != correct_ext:
+        filepath = base_path + correct_ext
+    return filepath
+
+
+def _request_headers(partial_size):
+    """Headers resuming a partial download from partial_size bytes."""
+    return {'Range': f'bytes={partial_size}-'} if partial_size else {}
+
+
+def _partial_size(partial_path):
+    """Size of an earlier interrupted download, or 0 if there is none."""
+    try:
+        return os.path.getsize(partial_path)
+    except OSError:
+        return 0
+
+
+def _range_total(headers):
+    """Full file size from a Content-Range header ('bytes <start>-<end>/<total>' or 'bytes */<total>')."""
+    try:
+        return int(headers.get('content-range', '').rsplit('/', 1)[1])
+    except (IndexError, ValueError):
+        return None
+
+
+def _expected_size(status, headers):
+    """Full size of the file being downloaded, or None if the server didn't say."""
+    if status == 206:
+        return _range_total(headers)
+    try:
+        return int(headers['content-length'])
+    except (KeyError, ValueError):
+        return None
+
+
+def _complete_partial(partial_path, filepath, partial_size, headers):
+    """Move a partial file into place if a 416 reply shows it already holds the whole file."""
+    if _range_total(headers) != partial_size:
+        return False
+    # Everything arrived before the previous run stopped; only the rename was missing
+    os.replace(partial_path, filepath)
+    _apply_last_modified(filepath, headers.get('last-modified'))
+    return True
+
+
+def _finish_download(partial_path, filepath, status, headers):
+    """Move a complete partial file into place; return an error message if it is truncated."""
+    expected = _expected_size(status, headers)
+    actual = os.path.getsize(partial_path)
+    if expected is not None and actual != expected:
+        return f"Incomplete download of {os.path.basename(filepath)}: {actual} of {expected} bytes"
+    os.replace(partial_path, filepath)
+    _apply_last_modified(filepath, headers.get('last-modified'))
+    return None
+
+
+def _apply_last_modified(filepath, last_modified):
+    """Set the file's modification time to the server's Last-Modified date."""
+    if not last_modified:
+        return
+    try:
+        mtime = parsedate_to_datetime(last_modified).timestamp()
+        os.utime(filepath, (mtime, mtime))
+    except (TypeError, ValueError, OSError):
+        # Malformed header or unsupported filesystem; keep the local time
+        pass
 
 
 def download_file(url, filepath, media_type=None):
-    """Download a single file from URL to filepath."""
+    """Download a single file from URL to filepath, resuming an earlier partial download."""
+    partial_path = filepath + PARTIAL_SUFFIX
     try:
-        response = requests.get(url, stream=True, timeout=180)
+        partial_size = _partial_size(partial_path)
+        response = SESSION.get(url, stream=True, timeout=180, headers=_request_headers(partial_size))
+        if response.status_code == 416 and partial_size:
+            response.close()
+            if _complete_partial(partial_path, filepath, partial_size, response.headers):
+                return filepath
+            # The partial file doesn't match the server's copy; start over
+            os.remove(partial_path)
+            return download_file(url, filepath, media_type)
         response.raise_for_status()
         
-        # Get actual content type and determine correct extension
-        content_type = response.headers.get('content-type', '').lower()
-        correct_ext = None
+        # Use the extension matching the actual content type
+        filepath = _correct_extension(filepath, response.headers.get('content-type', ''), media_type)
         
-        if 'video' in content_type or media_type == 'video':
-            if 'mp4' in content_type:
-                correct_ext = '.mp4'
-            elif 'mov' in content_type or 'quicktime' in content_type:
-                correct_ext = '.mov'
-            else:
-                correct_ext = '.mp4'  # Default for videos
-        elif 'image' in content_type:
-            if 'jpeg' in content_type or 'jpg' in content_type:
-                correct_ext = '.jpg'
-            elif 'png' in content_type:
-                correct_ext = '.png'
-            elif 'gif' in content_type:
-                correct_ext = '.gif'
-            else:
-                correct_ext = '.jpg'  # Default for images
-        else:
-            # Fallback based on media_type
-            correct_ext = '.mp4' if media_type == 'video' else '.jpg'
-        
-        # Update filepath if extension needs correction
-        if correct_ext:
-            base_path, current_ext = os.path.splitext(filepath)
-            if current_ext.lower() != correct_ext.lower():
-                filepath = base_path + correct_ext
-        
-        with open(filepath, 'wb') as f:
-            for chunk in response.iter_content(8192):
-                f.write(chunk)
+        # Append to the partial file only if the server honoured the Range request
+        resuming = response.status_code == 206
+        
+        # Copy the body in large chunks with a C-level loop. The partial file is not
+        # preallocated: its size must stay the number of bytes received, which is
+        # where an interrupted download resumes
+        response.raw.decode_content = True
+        with open(partial_path, 'ab' if resuming else 'wb', buffering=DOWNLOAD_CHUNK_SIZE) as f:
+            shutil.copyfileobj(response.raw, f, length=DOWNLOAD_CHUNK_SIZE)
+        
+        error_msg = _finish_download(partial_path, filepath, response.status_code, response.headers)
+        if error_msg:
+            return f"ERROR: {filepath} - {error_msg}"
         return filepath
     except requests.exceptions.RequestException as e:
         error_msg = f"Network error downloading {os.path.basename(filepath)}: {str(e)}"
@@ -62,66 +196,169 @@ def download_file(url, filepath, media_type=None):
         return f"ERROR: {filepath} - {error_msg}"
 
 
+async def _adownload_file(session, url, filepath, media_type=None):
+    """Download a single file from URL to filepath using an aiohttp session, resuming an earlier partial download."""
+    partial_path = filepath + PARTIAL_SUFFIX
+    try:
+        partial_size = _partial_size(partial_path)
+        async with session.get(url, headers=_request_headers(partial_size)) as response:
+            if response.status == 416 and partial_size:
+                if _complete_partial(partial_path, filepath, partial_size, response.headers):
+                    return filepath
+                # The partial file doesn't match the server's copy; start over
+                os.remove(partial_path)
+                return await _adownload_file(session, url, filepath, media_type)
+            response.raise_for_status()
+            
+            # Use the extension matching the actual content type
+            filepath = _correct_extension(filepath, response.headers.get('content-type', ''), media_type)
+            
+            # Append to the partial file only if the server honoured the Range request
+            resuming = response.status == 206
+            
+            # Not preallocated, so the partial file's size is the resume offset
+            with open(partial_path, 'ab' if resuming else 'wb', buffering=DOWNLOAD_CHUNK_SIZE) as f:
+                async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+            
+            error_msg = _finish_download(partial_path, filepath, response.status, response.headers)
+            if error_msg:
+                return f"ERROR: {filepath} - {error_msg}"
+        return filepath
+    except aiohttp.ClientError as e:
+        error_msg = f"Network error downloading {os.path.basename(filepath)}: {str(e)}"
+        return f"ERROR: {filepath} - {error_msg}"
+    except IOError as e:
+        error_msg = f"File I/O error for {os.path.basename(filepath)}: {str(e)}"
+        return f"ERROR: {filepath} - {error_msg}"
+    except Exception as e:
+        error_msg = f"Unexpected error downloading {os.path.basename(filepath)}: {str(e) or type(e).__name__}"
+        return f"ERROR: {filepath} - {error_msg}"
+
+
+async def _adownload_all(download_tasks, on_result):
+    """Download all tasks concurrently over one aiohttp session, reporting each result."""
+    # Originals are all served by the same CDN host, so the per-host limit is the real ceiling
+    max_transfers = config.DOWNLOAD_WORKERS
+    connector = aiohttp.TCPConnector(limit=max_transfers, limit_per_host=max_transfers)
+    timeout = aiohttp.ClientTimeout(sock_connect=180, sock_read=180)
+    headers = {'Accept-Encoding': 'identity'}
+    # Only start as many requests as the connector can serve, so large albums
+    # don't park thousands of pending requests in the connection pool
+    semaphore = asyncio.Semaphore(max_transfers)
+    
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=headers) as session:
+        async def run(task):
+            photo_id, url, path, media_type = task
+            async with semaphore:
+                result = await _adownload_file(session, url, path, media_type)
+            on_result(photo_id, result)
+        
+        await asyncio.gather(*(run(task) for task in download_tasks))
+
+
+def _link_or_copy(source_path, target_path):
+    """Hard-link source_path to target_path, copying when links are not supported."""
+    try:
+        os.link(source_path, target_path)
+    except OSError:
+        shutil.copy2(source_path, target_path)
+
+
+def _ensure_album_dir(album_title):
+    """Return (album_folder, names of the files in it), creating the folder if it is missing."""
+    album_folder = os.path.join(config.DOWNLOAD_DIR, album_title)
+    try:
+        with os.scandir(album_folder) as entries:
+            return album_folder, {entry.name for entry in entries}
+    except FileNotFoundError:
+        os.makedirs(album_folder, exist_ok=True)
+        return album_folder, set()
+
+
+def _file_extension(url, media_type):
+    """Get the file extension for a download from its URL, with defaults by media type."""
+    ext = os.path.splitext(url)[1]
+    if not ext:
+        # If no extension in URL, use defaults based on media type
+        return ".mp4" if media_type == 'video' else ".jpg"
+    if media_type == 'video' and ext.lower() in IMAGE_EXTENSIONS:
+        # If it's a video but has an image extension, it's likely incorrect
+        return ".mp4"
+    return ext
+
+
 class DownloadManager:
     """Manages concurrent downloads and progress tracking."""
     
-    def __init__(self, api_client):
+    def __init__(self, api_client, progress_log):
         self.api_client = api_client
+        self.progress_log = progress_log
+        # Local file of each photo downloaded or found on disk, used to link duplicates
+        self.downloaded_paths = {}
+        # Guards downloaded_ids when several albums are processed concurrently
+        self.ids_lock = Lock()
+        # Photos an album is downloading right now, each with an event set once it is done
+        self.in_flight = {}
         
     def process_downloads(self, album_title, photo_ids, flickr, url_cache, downloaded_ids):
-        """Process downloads for an entire album."""
-        album_folder = os.path.join(config.DOWNLOAD_DIR, album_title)
-        os.makedirs(album_folder, exist_ok=True)
+        """Process downloads for an entire album.
+        
+        photo_ids holds (photo_id, title) pairs whose titles are already sanitized for file names.
+        """
         print_and_log(f"📂 Processing album: {album_title} ({len(photo_ids)} media files)")
+        return self.process_download_pages(album_title, [photo_ids], flickr, url_cache, downloaded_ids)
+    
+    def process_download_pages(self, album_title, pages, flickr, url_cache, downloaded_ids):
+        """Process downloads for an album whose photos arrive in pages of (photo_id, title) pairs.
         
-        # Debug directory permissions
-        try:
-            test_file_path = os.path.join(album_folder, ".write_test")
-            with open(test_file_path, 'w') as f:
-                f.write("test")
-            os.remove(test_file_path)
-            print(f"  ✅ Directory is writable: {album_folder}")
-        except Exception as e:
-            print(f"  ❌ CRITICAL: Directory permission issue: {e}")
-            return {"album": album_title, "downloaded": 0, "skipped": 0, "failed": len(photo_ids)}
-
-        # Reset tracking for empty album
-        if os.path.exists(album_folder) and not os.listdir(album_folder) and photo_ids:
-            print(f"  🔄 Album directory exists but is empty. Resetting tracking for this album.")
-            album_photo_ids = {pid for pid, _ in photo_ids}
-            # Remove these IDs from downloaded_ids to force re-download
-            downloaded_ids.difference_update(album_photo_ids)
-            
-        download_tasks = []
+        The album folder is read and the album summary is reported once, however many pages there are.
+        """
+        # Read the album folder once; existence checks below are set lookups
+        album_folder, existing_files = _ensure_album_dir(album_title)
+        reset_tracking = not existing_files
+        
+        photo_count = 0
+        queued_count = 0
         downloaded_count = 0
         skipped_count = 0
         failed_count = 0
         
-        # Prepare download tasks
-        download_tasks, skipped_count, failed_count = self._prepare_download_tasks(
-            photo_ids, flickr, url_cache, downloaded_ids, album_folder
-        )
+        for photo_ids in pages:
+            photo_count += len(photo_ids)
+            
+            # Reset tracking for empty album
+            if reset_tracking and photo_ids:
+                if photo_count == len(photo_ids):
+                    print_and_log(f"  🔄 Album directory exists but is empty. Resetting tracking for this album.", "INFO")
+                album_photo_ids = {pid for pid, _ in photo_ids}
+                # Remove these IDs from downloaded_ids to force re-download
+                with self.ids_lock:
+                    downloaded_ids.difference_update(album_photo_ids)
+                self.progress_log.remove(album_photo_ids)
+            
+            queued, downloaded, skipped, failed = self._download_photos(
+                photo_ids, flickr, url_cache, downloaded_ids, album_folder, existing_files
+            )
+            queued_count += queued
+            downloaded_count += downloaded
+            skipped_count += skipped
+            failed_count += failed
         
-        if not download_tasks:
-            print(f"  ⚠️ No media files to download in this album. All {skipped_count} media files were skipped.")
-            if photo_ids and skipped_count == 0 and failed_count == 0:
-                print(f"  ⚠️ CRITICAL: No downloads were queued despite having {len(photo_ids)} media files.")
-            return {"album": album_title, "downloaded": 0, "skipped": skipped_count, "failed": failed_count}
+        # Save pending URL cache entries after album; progress is appended as files complete
+        url_cache.flush()
         
-        print_and_log(f"  🔽 Downloading {len(download_tasks)} media files...")
-
-        # Execute downloads concurrently
-        downloaded_count, additional_failed = self._execute_downloads(download_tasks, downloaded_ids)
-        failed_count += additional_failed
-
-        # Save progress after album
-        save_json_file(config.progress_file, {"downloaded_ids": list(downloaded_ids)})
+        if not queued_count:
+            print_and_log(f"  ⚠️ No media files to download in this album. All {skipped_count} media files were skipped.", "INFO")
+            if photo_count and skipped_count == 0 and failed_count == 0:
+                print_and_log(f"  ⚠️ CRITICAL: No downloads were queued despite having {photo_count} media files.", "WARNING")
+            return {"album": album_title, "downloaded": 0, "skipped": skipped_count, "failed": failed_count}
         
         # Verify downloads
         files_in_dir = len(os.listdir(album_folder))
-        print(f"  📊 Media files now in directory: {files_in_dir}")
+        print_and_log(f"  📊 Media files now in directory: {files_in_dir}", "INFO")
         if downloaded_count > 0 and files_in_dir == 0:
-            print(f"  ❌ CRITICAL: Media files were reported as downloaded but directory is empty!")
+            print_and_log(f"  ❌ CRITICAL: Media files were reported as downloaded but directory is empty!", "ERROR")
         
         return {
             "album": album_title,
@@ -130,68 +367,185 @@ class DownloadManager:
             "failed": failed_count
         }
     
-    def _prepare_download_tasks(self, photo_ids, flickr, url_cache, downloaded_ids, album_folder):
-        """Prepare the list of download tasks."""
+    def _download_photos(self, photo_ids, flickr, url_cache, downloaded_ids, album_folder, existing_files):
+        """Download one batch of an album's photos.
+        
+        Returns (queued_count, downloaded_count, skipped_count, failed_count).
+        """
+        downloaded_count = 0
+        claimed = []   # photo IDs this album downloads
+        deferred = []  # photos another album is downloading, linked once it is done
+        
+        try:
+            # Prepare download tasks
+            download_tasks, skipped_count, failed_count = self._prepare_download_tasks(
+                photo_ids, flickr, url_cache, downloaded_ids, album_folder, existing_files,
+                claimed, deferred
+            )
+            
+            if download_tasks:
+                print_and_log(f"  🔽 Downloading {len(download_tasks)} media files...")
+                
+                # Execute downloads concurrently
+                downloaded_count, additional_failed = self._execute_downloads(download_tasks, downloaded_ids)
+                failed_count += additional_failed
+        finally:
+            self._release_claims(claimed)
+        
+        linked_count, missing_count = self._link_deferred(deferred)
+        skipped_count += linked_count
+        failed_count += missing_count
+        
+        return len(download_tasks), downloaded_count, skipped_count, failed_count
+    
+    def _prepare_download_tasks(self, photo_ids, flickr, url_cache, downloaded_ids, album_folder, existing_files,
+                                claimed, deferred):
+        """Prepare the list of download tasks.
+        
+        Photo IDs this album will download are added to `claimed`; photos another
+        album is already downloading are added to `deferred` as (photo_id, target_stem, event).
+        """
         download_tasks = []
+        pending = []  # (photo_id, title, base_name) still needing a download URL
         skipped_count = 0
         failed_count = 0
         
+        # Existing files keyed by name without extension ("title_photoid");
+        # partial downloads are not skipped but resumed by download_file
+        existing_stems = {
+            os.path.splitext(name)[0]: name for name in existing_files
+            if not name.endswith(PARTIAL_SUFFIX)
+        }
+        album_folder_prefix = album_folder + os.sep
+        
         for i, (photo_id, title) in enumerate(photo_ids):
-            if photo_id in downloaded_ids:
-                print(f"  ⏩ Skipping {title} (ID: {photo_id}) (marked as downloaded)")
+            # Read both together: a photo another album just finished has its path recorded
+            with self.ids_lock:
+                is_downloaded = photo_id in downloaded_ids
+                has_copy = photo_id in self.downloaded_paths
+            if is_downloaded:
+                # Photos shared between albums are linked from the copy already on disk;
+                # the file name is only worked out when there is something to link
+                base_name = f"{title}_{photo_id}" if has_copy else None
+                if not (base_name and base_name not in existing_stems
+                        and self._link_copy(photo_id, album_folder_prefix + base_name)):
+                    print_and_log(f"  ⏩ Skipping {title} (ID: {photo_id}) (marked as downloaded)", "DEBUG")
                 skipped_count += 1
                 continue
 
-            try:
-                url_info = self.api_client.get_original_url_and_info(flickr, photo_id, url_cache)
-                if not url_info:  # Skip if video downloads are disabled
-                    skipped_count += 1
-                    continue
-                    
-                url = url_info['url']
-                media_type = url_info['media_type']
-                
-                # Log currently processed media file
-                media_icon = "🎥" if media_type == 'video' else "📸"
-                print_and_log(f"  {media_icon} Processing: {title} ({media_type})")
-                
-                # Use title + unique photo ID format: "title_uniqueid.extension"
-                # Get file extension from URL or use defaults
-                ext = os.path.splitext(url)[1]
-                if not ext:
-                    # If no extension in URL, use defaults based on media type
-                    if media_type == 'video':
-                        ext = ".mp4"  # Default video extension
-                    else:
-                        ext = ".jpg"  # Default photo extension
-                elif media_type == 'video' and ext.lower() in ['.jpg', '.jpeg', '.png']:
-                    # If it's a video but has an image extension, it's likely incorrect
-                    ext = ".mp4"
-                
-                # Create filename: title_photoid.extension
-                safe_title = sanitize_filename(title)
-                filename = f"{safe_title}_{photo_id}{ext}"
-                filepath = os.path.join(album_folder, filename)
-                
-                # Check if file already exists
-                if os.path.exists(filepath):
-                    print(f"  ⏩ Skipping {os.path.basename(filepath)} (file exists)")
-                    skipped_count += 1
+            # Use title + unique photo ID format: "title_uniqueid.extension"
+            base_name = f"{title}_{photo_id}"
+            existing_name = existing_stems.get(base_name)
+
+            # Check if file already exists before spending API calls on its URL
+            if existing_name:
+                print_and_log(f"  ⏩ Skipping {existing_name} (file exists)", "DEBUG")
+                skipped_count += 1
+                # Record the path before the ID is visible to other albums
+                with self.ids_lock:
+                    self.downloaded_paths[photo_id] = album_folder_prefix + existing_name
                     downloaded_ids.add(photo_id)
-                    continue
+                self.progress_log.append(photo_id)
+                continue
 
-                download_tasks.append((photo_id, url, filepath, media_type))
+            # Only one album downloads a photo; others link its copy once it is done
+            with self.ids_lock:
+                event = self.in_flight.get(photo_id)
+                if event is None:
+                    self.in_flight[photo_id] = Event()
+            if event is not None:
+                deferred.append((photo_id, album_folder_prefix + base_name, event))
+                continue
+            claimed.append(photo_id)
+
+            pending.append((photo_id, title, base_name))
+        
+        # Resolve download URLs concurrently; API calls are still spaced by the shared rate limiter
+        def resolve(item):
+            try:
+                return self.api_client.get_original_url_and_info(flickr, item[0], url_cache), None
             except Exception as e:
-                error_msg = f"Error preparing download for {title} (ID: {photo_id}): {str(e)}"
+                return None, e
+        
+        with ThreadPoolExecutor(max_workers=config.MAX_WORKERS) as executor:
+            resolved = list(executor.map(resolve, pending))
+        
+        for (photo_id, title, base_name), (url_info, error) in zip(pending, resolved):
+            if error is not None:
+                error_msg = f"Error preparing download for {title} (ID: {photo_id}): {str(error)}"
                 print_and_log(f"  ❌ {error_msg}", "ERROR")
                 failed_count += 1
+                continue
+            if not url_info:  # Skip if video downloads are disabled
+                skipped_count += 1
+                continue
+            
+            url = url_info['url']
+            media_type = url_info['media_type']
+            
+            # Log currently processed media file
+            media_icon = "🎥" if media_type == 'video' else "📸"
+            print_and_log(f"  {media_icon} Processing: {title} ({media_type})", "DEBUG")
+            
+            # Create filename: title_photoid.extension
+            filepath = album_folder_prefix + base_name + _file_extension(url, media_type)
+
+            download_tasks.append((photo_id, url, filepath, media_type))
         
         return download_tasks, skipped_count, failed_count
     
+    def _link_copy(self, photo_id, target_stem):
+        """Link the downloaded copy of a photo to target_stem plus its extension; return True on success."""
+        with self.ids_lock:
+            source_path = self.downloaded_paths.get(photo_id)
+        if not source_path or not os.path.exists(source_path):
+            return False
+        target_path = target_stem + os.path.splitext(source_path)[1]
+        try:
+            _link_or_copy(source_path, target_path)
+        except OSError as e:
+            print_and_log(f"  ⚠️ Could not link {os.path.basename(target_path)}: {e}", "WARNING")
+            return False
+        print_and_log(f"  🔗 Linked {os.path.basename(target_path)} from {os.path.dirname(source_path)}", "DEBUG")
+        return True
+    
+    def _release_claims(self, claimed):
+        """Mark this album's downloads as done so albums waiting on them can link their copies."""
+        with self.ids_lock:
+            events = [self.in_flight.pop(photo_id) for photo_id in claimed]
+        for event in events:
+            event.set()
+    
+    def _link_deferred(self, deferred):
+        """Link photos downloaded by other albums; return (linked_count, missing_count)."""
+        linked_count = 0
+        missing_count = 0
+        for photo_id, target_stem, event in deferred:
+            event.wait()
+            if self._link_copy(photo_id, target_stem):
+                linked_count += 1
+            else:
+                print_and_log(f"  ❌ Failed: {os.path.basename(target_stem)} - not downloaded by the other album", "ERROR")
+                missing_count += 1
+        return linked_count, missing_count
+    
     def _execute_downloads(self, download_tasks, downloaded_ids):
         """Execute downloads concurrently and track results."""
-        downloaded_count = 0
-        failed_count = 0
+        counters = {"downloaded": 0, "failed": 0}
+        counters_lock = Lock()
+        
+        # Workers hand log lines to a single printer thread so they never block on stdout
+        log_queue = queue.Queue()
+        
+        def log(message, level="INFO"):
+            log_queue.put((message, level))
+        
+        def printer():
+            while True:
+                item = log_queue.get()
+                if item is None:
+                    break
+                print_and_log(*item)
         
         def download_task(task):
             photo_id, url, path, media_type = task
@@ -200,45 +554,72 @@ class DownloadManager:
                 return photo_id, result
             except Exception as e:
                 return photo_id, f"ERROR: {path} - {e}"
-
-        with ThreadPoolExecutor(max_workers=config.MAX_WORKERS) as executor:
-            futures = [executor.submit(download_task, t) for t in download_tasks]
-            
-            for future in as_completed(futures):
-                try:
-                    photo_id, result = future.result()
-                    if isinstance(result, str) and result.startswith("ERROR"):
-                        # Extract the actual error message for better logging
-                        error_parts = result.split(" - ", 1)
-                        filename = os.path.basename(error_parts[0].replace('ERROR: ', ''))
-                        error_detail = error_parts[1] if len(error_parts) > 1 else "Unknown error"
-                        print_and_log(f"  ❌ Failed: {filename} - {error_detail}", "ERROR")
-                        failed_count += 1
+        
+        def handle_result(photo_id, result):
+            try:
+                if isinstance(result, str) and result.startswith("ERROR"):
+                    # Extract the actual error message for better logging
+                    error_parts = result.split(" - ", 1)
+                    filename = os.path.basename(error_parts[0].replace('ERROR: ', ''))
+                    error_detail = error_parts[1] if len(error_parts) > 1 else "Unknown error"
+                    log(f"  ❌ Failed: {filename} - {error_detail}", "ERROR")
+                    outcome = "failed"
+                else:
+                    # Determine media type from file extension for logging
+                    filename = os.path.basename(result)
+                    is_video_download = os.path.splitext(result)[1].lower() in VIDEO_EXTENSIONS
+                    media_icon = "🎥" if is_video_download else "📸"
+                    log(f"  ✅ Downloaded: {media_icon} {filename}")
+                    
+                    # Verify file exists and has content
+                    if os.path.exists(result) and os.path.getsize(result) > 0:
+                        outcome = "downloaded"
                     else:
-                        # Determine media type from file extension for logging
-                        filename = os.path.basename(result)
-                        is_video_download = result.lower().endswith(('.mp4', '.mov', '.avi', '.webm'))
-                        media_icon = "🎥" if is_video_download else "📸"
-                        print_and_log(f"  ✅ Downloaded: {media_icon} {filename}")
-                        
-                        # Verify file exists and has content
-                        if os.path.exists(result) and os.path.getsize(result) > 0:
-                            downloaded_count += 1
-                            downloaded_ids.add(photo_id)
-                        else:
-                            error_msg = f"File verification failed for {filename} - file is empty or missing"
-                            print_and_log(f"  ⚠️ {error_msg}", "WARNING")
-                            # Try to remove the empty/corrupted file
-                            try:
-                                if os.path.exists(result):
-                                    os.remove(result)
-                                    print_and_log(f"  🗑️ Removed empty file: {filename}", "DEBUG")
-                            except Exception as cleanup_error:
-                                print_and_log(f"  ⚠️ Could not remove empty file {filename}: {cleanup_error}", "WARNING")
-                            failed_count += 1
-                except Exception as e:
-                    error_msg = f"Unexpected error processing download result: {str(e)}"
-                    print_and_log(f"  ❌ {error_msg}", "ERROR")
-                    failed_count += 1
-        
-        return downloaded_count, failed_count
+                        error_msg = f"File verification failed for {filename} - file is empty or missing"
+                        log(f"  ⚠️ {error_msg}", "WARNING")
+                        # Try to remove the empty/corrupted file
+                        try:
+                            if os.path.exists(result):
+                                os.remove(result)
+                                log(f"  🗑️ Removed empty file: {filename}", "DEBUG")
+                        except Exception as cleanup_error:
+                            log(f"  ⚠️ Could not remove empty file {filename}: {cleanup_error}", "WARNING")
+                        outcome = "failed"
+            except Exception as e:
+                error_msg = f"Unexpected error processing download result: {str(e)}"
+                log(f"  ❌ {error_msg}", "ERROR")
+                outcome = "failed"
+            
+            with counters_lock:
+                counters[outcome] += 1
+            if outcome == "downloaded":
+                # Record the path before the ID is visible to other albums
+                with self.ids_lock:
+                    self.downloaded_paths[photo_id] = result
+                    downloaded_ids.add(photo_id)
+                self.progress_log.append(photo_id)
+        
+        def handle_future(future):
+            try:
+                photo_id, result = future.result()
+            except Exception as e:
+                photo_id, result = None, f"ERROR: unknown - {e}"
+            handle_result(photo_id, result)
+        
+        printer_thread = Thread(target=printer, daemon=True)
+        printer_thread.start()
+        
+        try:
+            if aiohttp is not None:
+                # Overlap many HTTP transfers on one event loop
+                asyncio.run(_adownload_all(download_tasks, handle_result))
+            else:
+                # Leaving the executor block waits for every download and its callback
+                with ThreadPoolExecutor(max_workers=config.DOWNLOAD_WORKERS) as executor:
+                    for task in download_tasks:
+                        executor.submit(download_task, task).add_done_callback(handle_future)
+        finally:
+            log_queue.put(None)
+            printer_thread.join()
+        
+        return counters["downloaded"], counters["failed"]
@@ -3,13 +3,21 @@ Main application module for the Flickr downloader.
 Orchestrates the entire download process.
 """
 import os
+import queue
+import itertools
+import atexit
+import signal
 import flickrapi
+from threading import Event, Thread
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from .config import config
-from .utils.ui import print_and_log, ProgressSpinner, create_spinner_message, setup_logging
-from .utils.files import load_json_file, save_json_file, sanitize_filename
+from .utils.ui import print_and_log, ProgressSpinner, create_spinner_message, setup_logging, stop_logging
+from .utils.files import sanitize_filename, BatchedJsonCache
+from .utils.cache_db import CacheDatabase
 from .api.client import FlickrAPIClient
-from .download.manager import DownloadManager
+from .download.manager import DownloadManager, set_concurrent_albums
 from .verification.checker import AlbumVerifier
 from .cli import parse_arguments, filter_albums_by_pattern
 
@@ -19,10 +27,23 @@ class FlickrDownloaderApp:
     
     def __init__(self):
         self.api_client = FlickrAPIClient()
-        self.download_manager = DownloadManager(self.api_client)
-        self.verifier = AlbumVerifier(self.api_client)
+        self.cache_db = CacheDatabase(
+            config.cache_db_file,
+            legacy_url_cache_file=config.url_cache_file,
+            legacy_progress_file=config.progress_file,
+            legacy_progress_log_file=config.progress_log_file
+        )
+        self.progress_log = self.cache_db.progress
+        self.download_manager = DownloadManager(self.api_client, self.progress_log)
+        self.verifier = AlbumVerifier(self.api_client, self.progress_log)
         self.flickr = None
         self.user_id = None
+        # Cleanup run at exit or on SIGTERM, as (func, args)
+        self._exit_callbacks = []
+        # Number of scanned albums each photo appears in
+        self.album_photo_counts = Counter()
+        # Photos of albums skipped by SKIP_ALBUMS or Auto Upload, kept out of Unsorted
+        self.skipped_album_photo_ids = set()
         
     def run(self):
         """Run the main application."""
@@ -56,13 +77,24 @@ class FlickrDownloaderApp:
         # Setup directories and load cache
         os.makedirs(config.DOWNLOAD_DIR, exist_ok=True)
         os.makedirs(config.CACHE_DIR, exist_ok=True)
+        
+        if not self._check_download_dir_writable():
+            return
 
-        url_cache = load_json_file(config.url_cache_file)
-        progress = load_json_file(config.progress_file)
-        downloaded_ids = set(progress.get("downloaded_ids", []))
+        # Start from the API rate the previous run ended at
+        self.api_client.rate_limiter.load_state(config.rate_file)
+        self._register_exit(self.api_client.rate_limiter.save_state, config.rate_file)
+
+        url_cache = self.cache_db.url_cache
+        self._register_exit(self.cache_db.close)
+        scan_cache = BatchedJsonCache(config.scan_cache_file)
+        self._register_exit(scan_cache.close)
+        # Save the caches and stop right away on SIGTERM
+        signal.signal(signal.SIGTERM, self._exit_on_sigterm)
+        downloaded_ids = self.progress_log.load()
 
         # Scan albums and process downloads
-        album_summaries, album_ids = self._scan_albums(args, downloaded_ids)
+        album_summaries, album_ids = self._scan_albums(args, downloaded_ids, scan_cache)
         
         if not album_summaries:
             return
@@ -73,17 +105,38 @@ class FlickrDownloaderApp:
             url_cache, downloaded_ids
         )
         
-        # Skip unsorted photos processing - only download from organized albums
-        print_and_log("ℹ️ Skipping unsorted photos - downloading from organized albums only")
+        # Unsorted photos are only downloaded on request, alongside the albums
+        if not self._should_process_unsorted(args):
+            print_and_log("ℹ️ Skipping unsorted photos - downloading from organized albums only")
         
         # Final summary and verification
         self._show_final_summary(args, result_summaries)
         
         print_and_log("=" * 50)
 
+    def _register_exit(self, func, *args):
+        """Run func(*args) at exit, and also when the run is stopped by SIGTERM."""
+        atexit.register(func, *args)
+        self._exit_callbacks.append((func, args))
+
+    def _exit_on_sigterm(self, signum, frame):
+        """Save the caches and exit without waiting for queued album scans and downloads.
+        
+        Raising SystemExit is not enough: leaving a ThreadPoolExecutor block, and
+        interpreter shutdown itself, wait for every queued task to finish.
+        """
+        print_and_log("🛑 Received SIGTERM, saving caches and exiting", "WARNING")
+        for func, args in reversed(self._exit_callbacks):
+            func(*args)
+        stop_logging()
+        # Transfers cut off here leave .part files holding only the bytes received;
+        # the next run resumes them with a Range request
+        os._exit(128 + signum)
+
     def _initialize_flickr_api(self):
         """Initialize and authenticate with Flickr API."""
         self.flickr = flickrapi.FlickrAPI(config.API_KEY, config.API_SECRET, format='parsed-json')
+        self.api_client.configure_session(self.flickr)
         
         if not self.flickr.token_valid(perms='read'):
             self.flickr.get_request_token(oauth_callback='oob')
@@ -96,24 +149,36 @@ class FlickrDownloaderApp:
         self.user_id = user_info['user']['id']
         return True
 
-    def _scan_albums(self, args, downloaded_ids):
+    def _check_download_dir_writable(self):
+        """Check once that the download directory is writable."""
+        try:
+            test_file_path = os.path.join(config.DOWNLOAD_DIR, ".write_test")
+            with open(test_file_path, 'w') as f:
+                f.write("test")
+            os.remove(test_file_path)
+            return True
+        except Exception as e:
+            print_and_log(f"❌ CRITICAL: Download directory is not writable: {config.DOWNLOAD_DIR} ({e})", "ERROR")
+            return False
+
+    def _scan_albums(self, args, downloaded_ids, scan_cache):
         """Scan all albums and prepare for downloads."""
         print_and_log("🔍 Scanning albums...")
         
         # Get list of all albums
-        photosets = self.api_client.call_with_retries(
-            self.flickr.photosets.getList, user_id=self.user_id
-        )['photosets']['photoset']
+        photosets = self.api_client.fetch_photosets(self.flickr, self.user_id)
         
         # Filter out skipped albums (Auto Upload and others from SKIP_ALBUMS)
         original_count = len(photosets)
         filtered_photosets = []
+        skipped_photosets = []
         skipped_albums = []
         
         for photoset in photosets:
             album_title = photoset['title']['_content']
             if config.should_skip_album(album_title):
                 skipped_albums.append(album_title)
+                skipped_photosets.append(photoset)
             else:
                 filtered_photosets.append(photoset)
         
@@ -138,66 +203,120 @@ class FlickrDownloaderApp:
         # Create simple album summaries
         album_summaries = {}
         total_albums = len(photosets)
+        scan_results = [None] * total_albums
         
-        for album_index, photoset in enumerate(photosets, 1):
-            album_id = photoset['id']
-            album_title = sanitize_filename(photoset['title']['_content'])
+        # Scan albums concurrently; API calls are still rate limited by the shared client
+        with ThreadPoolExecutor(max_workers=config.MAX_WORKERS) as executor:
+            futures = {
+                executor.submit(self._scan_album, photoset, downloaded_ids, scan_cache): index
+                for index, photoset in enumerate(photosets)
+            }
+            
+            for completed, future in enumerate(as_completed(futures), 1):
+                result = future.result()
+                scan_results[futures[future]] = result
+                spinner.update(create_spinner_message(completed, total_albums, result[0]))
+        
+        # Fold results in the original album order
+        scanned_albums = []
+        for album_title, album_id, summary, album_photo_ids in scan_results:
             album_ids[album_title] = album_id
+            if summary is not None:
+                album_summaries[album_title] = summary
+                scanned_albums.append((album_title, album_photo_ids))
+        
+        # Count album memberships in one pass; photos counted more than once are shared
+        album_photo_counts = Counter(pid for _, album_photo_ids in scanned_albums for pid in album_photo_ids)
+        duplicate_count = sum(1 for count in album_photo_counts.values() if count > 1)
+        self.album_photo_counts = album_photo_counts
+        
+        # Photos of skipped albums are in an album too, so they must not land in Unsorted
+        if self._should_process_unsorted(args) and skipped_photosets:
+            self.skipped_album_photo_ids = self._list_album_photo_ids(skipped_photosets, scan_cache)
+        scan_cache.flush()
+        
+        # Stop the spinner and show completion
+        spinner.stop("✅ Album scanning completed!")
+        
+        if duplicate_count:
+            print_and_log(f"📊 Found {duplicate_count} media files that appear in multiple albums")
+        
+        return album_summaries, album_ids
 
-            # Update progress spinner with current album
-            spinner.update(create_spinner_message(album_index, total_albums, album_title))
+    def _list_album_photo_ids(self, photosets, scan_cache):
+        """Get the IDs of all photos in the given albums."""
+        def list_album(photoset):
+            return [
+                photo['id'] for photo in self.api_client.fetch_album_photos_cached(
+                    self.flickr, photoset, self.user_id, scan_cache
+                )
+            ]
+        
+        photo_ids = set()
+        with ThreadPoolExecutor(max_workers=config.MAX_WORKERS) as executor:
+            for album_photo_ids in executor.map(list_album, photosets):
+                photo_ids.update(album_photo_ids)
+        return photo_ids
 
-            # Get album info to check photo/video counts before fetching all content
+    def _scan_album(self, photoset, downloaded_ids, scan_cache):
+        """Scan a single album.
+        
+        Returns (album_title, album_id, summary, photo_ids); summary is None if the album is skipped.
+        """
+        album_id = photoset['id']
+        album_title = sanitize_filename(photoset['title']['_content'])
+
+        # Check photo/video counts before fetching all content; the album list
+        # already carries them, so only fall back to getInfo when missing
+        if 'count_photos' in photoset and 'count_videos' in photoset:
+            album_info = photoset
+        else:
             album_info = self.api_client.call_with_retries(
                 self.flickr.photosets.getInfo, photoset_id=album_id
             )['photoset']
-            
-            photo_count = int(album_info.get('count_photos', 0))
-            video_count = int(album_info.get('count_videos', 0))
-            
-            # Skip albums that only contain videos when video downloads are disabled
-            if not config.DOWNLOAD_VIDEO and photo_count == 0 and video_count > 0:
-                print_and_log(f"⏭️ Skipping '{album_title}' - contains only {video_count} videos (DOWNLOAD_VIDEO=false)")
-                continue
-            elif not config.DOWNLOAD_VIDEO and video_count > 0:
-                print_and_log(f"📊 Album '{album_title}': {photo_count} photos, {video_count} videos (videos will be skipped)")
+        
+        photo_count = int(album_info.get('count_photos', 0))
+        video_count = int(album_info.get('count_videos', 0))
+        
+        # Skip albums that only contain videos when video downloads are disabled
+        if not config.DOWNLOAD_VIDEO and photo_count == 0 and video_count > 0:
+            print_and_log(f"⏭️ Skipping '{album_title}' - contains only {video_count} videos (DOWNLOAD_VIDEO=false)")
+            return album_title, album_id, None, []
+        elif not config.DOWNLOAD_VIDEO and video_count > 0:
+            print_and_log(f"📊 Album '{album_title}': {photo_count} photos, {video_count} videos (videos will be skipped)")
 
-            # Fetch all photos from this album
-            album_photo_data = self.api_client.fetch_album_photos(self.flickr, album_id, self.user_id)
-            
-            # Create list of photos to download
-            photos_to_download = []
-            skipped_count = 0
-            
-            for photo in album_photo_data:
-                pid = photo['id']
-                title = sanitize_filename(photo['title'] or pid)
-                
-                if pid not in downloaded_ids:
-                    photos_to_download.append((pid, title))
-                else:
-                    skipped_count += 1
-                
-                # Update spinner occasionally to show activity
-                if len(photos_to_download) % 50 == 0:
-                    spinner.update(create_spinner_message(album_index, total_albums, album_title))
+        # Fetch all photos from this album (served from the scan cache if unchanged)
+        album_photo_data = self.api_client.fetch_album_photos_cached(
+            self.flickr, photoset, self.user_id, scan_cache
+        )
+        
+        # Create list of photos to download, collecting every photo ID in the same pass
+        photos_to_download, album_photo_ids = self._split_downloaded(album_photo_data, downloaded_ids)
+        skipped_count = len(album_photo_ids) - len(photos_to_download)
 
-            # Create album summary
-            album_summaries[album_title] = {
-                "album": album_title,
-                "to_download": photos_to_download,
-                "downloaded": 0,
-                "skipped": skipped_count,
-                "failed": 0
-            }
+        # Create album summary
+        summary = {
+            "album": album_title,
+            "to_download": photos_to_download,
+            "downloaded": 0,
+            "skipped": skipped_count,
+            "failed": 0
+        }
+        return album_title, album_id, summary, album_photo_ids
 
-            # Final update for this album
-            spinner.update(create_spinner_message(album_index, total_albums, album_title))
-        
-        # Stop the spinner and show completion
-        spinner.stop("✅ Album scanning completed!")
-        
-        return album_summaries, album_ids
+    @staticmethod
+    def _split_downloaded(album_photo_data, downloaded_ids):
+        """Split an album listing into (id, title) pairs still to download and all photo IDs."""
+        photos_to_download = []
+        album_photo_ids = []
+        
+        for photo in album_photo_data:
+            pid = photo['id']
+            album_photo_ids.append(pid)
+            if pid not in downloaded_ids:
+                photos_to_download.append((pid, sanitize_filename(photo['title'] or pid)))
+        
+        return photos_to_download, album_photo_ids
 
     def _filter_albums(self, args, photosets):
         """Filter albums based on command line arguments."""
@@ -214,9 +333,7 @@ class FlickrDownloaderApp:
                 print_and_log(f"❌ No albums found matching pattern '{args.album}'")
                 print_and_log("Available albums (excluding skipped albums):")
                 # Get the original unfiltered list but apply skip filtering
-                all_photosets = self.api_client.call_with_retries(
-                    self.flickr.photosets.getList, user_id=self.user_id
-                )['photosets']['photoset']
+                all_photosets = self.api_client.fetch_photosets(self.flickr, self.user_id)
                 
                 # Filter out skipped albums from display list too
                 available_albums = [ps for ps in all_photosets 
@@ -240,29 +357,67 @@ class FlickrDownloaderApp:
         result_summaries = []
         albums_with_verification_issues = []
         
+        # Download several albums at once; results are reported in album order
+        album_results = {}
+        num_threads = max(1, args.num_threads)
+        process_unsorted = self._should_process_unsorted(args)
+        # Unsorted media downloads on a worker of its own, next to the albums
+        set_concurrent_albums(num_threads + (1 if process_unsorted else 0))
+        
+        # Albums waiting for a worker have their URLs looked up while earlier albums download
+        started_albums = set()
+        stop_prefetch = Event()
+        queued_albums = [title for title, summary in album_summaries.items() if summary["to_download"]]
+        prefetch_thread = Thread(
+            target=self._prefetch_album_urls,
+            args=(queued_albums[num_threads:], album_summaries, started_albums, stop_prefetch,
+                  url_cache, downloaded_ids),
+            daemon=True
+        )
+        prefetch_thread.start()
+        
+        def process_album(album_title, photo_ids):
+            started_albums.add(album_title)
+            return self.download_manager.process_downloads(
+                album_title, photo_ids, self.flickr, url_cache, downloaded_ids
+            )
+        
+        with ThreadPoolExecutor(max_workers=num_threads) as executor, \
+                ThreadPoolExecutor(max_workers=1) as unsorted_executor:
+            # Unsorted media is listed and downloaded alongside the albums rather than after them,
+            # on its own worker so it never holds up an album slot
+            unsorted_future = None
+            if process_unsorted:
+                unsorted_future = unsorted_executor.submit(self._process_unsorted_photos, url_cache, downloaded_ids)
+            
+            futures = {
+                executor.submit(process_album, album_title, album_summaries[album_title]["to_download"]): album_title
+                for album_title in queued_albums
+            }
+            for future in as_completed(futures):
+                album_title = futures[future]
+                try:
+                    album_results[album_title] = future.result()
+                except Exception as e:
+                    print_and_log(f"❌ Error downloading album {album_title}: {e}", "ERROR")
+                    summary = album_summaries[album_title]
+                    album_results[album_title] = {
+                        "album": album_title,
+                        "downloaded": 0,
+                        "skipped": summary["skipped"],
+                        "failed": len(summary["to_download"])
+                    }
+            
+            unsorted_summary = unsorted_future.result() if unsorted_future else None
+        
+        stop_prefetch.set()
+        prefetch_thread.join()
+        
         for album_title, summary in album_summaries.items():
-            album_result = None
+            album_result = album_results.get(album_title)
             
-            if summary["to_download"]:
-                result = self.download_manager.process_downloads(
-                    album_title, summary["to_download"], self.flickr, url_cache, downloaded_ids
-                )
-                album_result = result
-                
-                # For single album downloads, verify immediately
-                self.verifier.handle_single_album_verification(
-                    args, album_title, album_ids, self.flickr, downloaded_ids, 
-                    albums_with_verification_issues
-                )
-            else:
+            if album_result is None:
                 print_and_log(f"\n📂 Album: {album_title} - All {summary['skipped']} media files already downloaded")
-                
-                # For single album downloads, verify immediately
-                self.verifier.handle_single_album_verification(
-                    args, album_title, album_ids, self.flickr, downloaded_ids, 
-                    albums_with_verification_issues
-                )
-                
                 album_result = {
                     "album": album_title,
                     "downloaded": 0,
@@ -270,8 +425,16 @@ class FlickrDownloaderApp:
                     "failed": 0
                 }
             
-            if album_result:
-                result_summaries.append(album_result)
+            # For single album downloads, verify immediately
+            self.verifier.handle_single_album_verification(
+                args, album_title, album_ids, self.flickr, downloaded_ids, 
+                albums_with_verification_issues
+            )
+            
+            result_summaries.append(album_result)
+        
+        if unsorted_summary:
+            result_summaries.append(unsorted_summary)
         
         # Handle verification issues and retries
         self._handle_verification_issues(
@@ -281,6 +444,28 @@ class FlickrDownloaderApp:
         
         return result_summaries
 
+    def _prefetch_album_urls(self, album_titles, album_summaries, started_albums, stop,
+                             url_cache, downloaded_ids):
+        """Fill the URL cache for albums that have not started downloading yet.
+        
+        An album is left alone once a worker picks it up, so the prefetch
+        never competes with an album's own URL lookups.
+        """
+        for album_title in album_titles:
+            for photo_id, _ in album_summaries[album_title]["to_download"]:
+                if stop.is_set() or album_title in started_albums:
+                    break
+                # Listing URLs and downloaded photos need no API call
+                if photo_id in downloaded_ids or photo_id in self.api_client.listing_urls:
+                    continue
+                try:
+                    self.api_client.get_original_url_and_info(self.flickr, photo_id, url_cache)
+                except Exception as e:
+                    # The album's own lookup retries and reports the error
+                    print_and_log(f"  ⚠️ Could not prefetch URL for {photo_id}: {e}", "DEBUG")
+            if stop.is_set():
+                return
+
     def _handle_verification_issues(self, args, albums_with_verification_issues, album_summaries, 
                                    album_ids, url_cache, downloaded_ids, result_summaries):
         """Handle albums that need verification and potential retries."""
@@ -298,9 +483,6 @@ class FlickrDownloaderApp:
                     )
                     
                     if not verification_passed:
-                        # Save updated progress cache after resetting tracking
-                        save_json_file(config.progress_file, {"downloaded_ids": list(downloaded_ids)})
-                        print_and_log(f"     Saved updated progress cache", "INFO")
                         albums_with_verification_issues.append((album_title, album_ids[album_title]))
 
         # Handle albums that need retry downloads (with user confirmation)
@@ -322,23 +504,19 @@ class FlickrDownloaderApp:
             if response not in ['y', 'yes']:
                 albums_with_verification_issues = []
         
+        # Index result summaries by album so retries update them without a list scan
+        summaries_by_album = {summary["album"]: summary for summary in result_summaries}
+        
         # Process retry downloads for confirmed albums
         for album_title, album_id in albums_with_verification_issues:
             print_and_log(f"🔄 Retrying download for album with missing files: {album_title}")
             
             # Re-scan this album to find files that need downloading
-            retry_photos = []
-            
             # Fetch all photos from this album
             retry_album_data = self.api_client.fetch_album_photos(self.flickr, album_id, self.user_id)
             
-            for photo in retry_album_data:
-                pid = photo['id']
-                title = sanitize_filename(photo['title'] or pid)
-                
-                # Only add if not in downloaded_ids (after reset)
-                if pid not in downloaded_ids:
-                    retry_photos.append((pid, title))
+            # Only add if not in downloaded_ids (after reset)
+            retry_photos, _ = self._split_downloaded(retry_album_data, downloaded_ids)
             
             if retry_photos:
                 print_and_log(f"     Found {len(retry_photos)} files to retry")
@@ -347,11 +525,10 @@ class FlickrDownloaderApp:
                 )
                 
                 # Update the result summary for this album
-                for summary in result_summaries:
-                    if summary["album"] == album_title:
-                        summary["downloaded"] += retry_result["downloaded"]
-                        summary["failed"] += retry_result["failed"]
-                        break
+                summary = summaries_by_album.get(album_title)
+                if summary:
+                    summary["downloaded"] += retry_result["downloaded"]
+                    summary["failed"] += retry_result["failed"]
                 
                 # Verify again after retry
                 print_and_log(f"🔍 Re-verifying album after retry: {album_title}")
@@ -369,28 +546,61 @@ class FlickrDownloaderApp:
             else:
                 print_and_log(f"     No files found to retry (this may indicate a verification logic issue)")
 
-    def _process_unsorted_photos(self, url_cache, downloaded_ids, result_summaries):
-        """Process unsorted photos that aren't in any album."""
+    def _should_process_unsorted(self, args):
+        """Check whether unsorted media should be downloaded in this run.
+        
+        Album photo IDs are only known for every album when no --album filter is given.
+        """
+        return args.unsorted and not args.album
+
+    def _process_unsorted_photos(self, url_cache, downloaded_ids):
+        """Process unsorted photos that aren't in any album, returning their summary or None."""
         print_and_log("📂 Processing unsorted media files...")
         
-        # Get all album photo IDs to exclude from unsorted
-        all_album_photo_ids = set()
-        for summary in result_summaries:
-            # This is a simplified approach; in a real implementation, 
-            # we'd need to track all album photo IDs properly
-            pass
+        # Get all album photo IDs to exclude from unsorted, skipped albums included,
+        # as a set for O(1) membership checks
+        all_album_photo_ids = set(self.album_photo_counts) | self.skipped_album_photo_ids
+        
+        # List the photostream on a producer thread so downloads start with the first page
+        page_queue = queue.Queue(maxsize=2)
+        
+        def produce():
+            try:
+                for page_photo_ids in self.api_client.iter_unsorted_photos(
+                    self.flickr, self.user_id, all_album_photo_ids
+                ):
+                    if page_photo_ids:
+                        page_queue.put(page_photo_ids)
+            except Exception as e:
+                page_queue.put(e)
+            page_queue.put(None)
+        
+        producer = Thread(target=produce, daemon=True)
+        producer.start()
+        
+        def pages():
+            while True:
+                page_photo_ids = page_queue.get()
+                if page_photo_ids is None:
+                    return
+                if isinstance(page_photo_ids, Exception):
+                    print_and_log(f"❌ Error listing unsorted media files: {page_photo_ids}", "ERROR")
+                    continue
+                yield page_photo_ids
+        
+        page_iter = pages()
+        first_page = next(page_iter, None)
+        if first_page is None:
+            producer.join()
+            print_and_log("\n📂 No media files found outside of albums.")
+            return None
         
-        unsorted_photo_ids = self.api_client.fetch_unsorted_photos(
-            self.flickr, self.user_id, all_album_photo_ids
+        # Pages are downloaded as they arrive; the folder setup and summary happen once
+        summary = self.download_manager.process_download_pages(
+            "Unsorted", itertools.chain([first_page], page_iter), self.flickr, url_cache, downloaded_ids
         )
-
-        if unsorted_photo_ids:
-            summary = self.download_manager.process_downloads(
-                "Unsorted", unsorted_photo_ids, self.flickr, url_cache, downloaded_ids
-            )
-            result_summaries.append(summary)
-        else:
-            print_and_log("\n📂 No media files found outside of albums.")
+        producer.join()
+        return summary
 
     def _show_final_summary(self, args, result_summaries):
         """Show final download summary and perform account verification."""
@@ -414,17 +624,20 @@ class FlickrDownloaderApp:
                 successful_albums.append(summary)
         
         # Show successful albums first
+        # Each section is emitted as one multi-line message rather than one call per album
         if successful_albums:
-            print_and_log("  ✅ Albums completed successfully:")
-            for summary in successful_albums:
-                print_and_log(f"    📂 {summary['album']}: {summary['downloaded']} downloaded, {summary['skipped']} skipped")
+            print_and_log("  ✅ Albums completed successfully:\n" + "\n".join(
+                f"    📂 {summary['album']}: {summary['downloaded']} downloaded, {summary['skipped']} skipped"
+                for summary in successful_albums
+            ))
         
         # Show failed albums in a separate section
         if failed_albums:
-            print_and_log("  ❌ Albums with failures:")
-            for summary in failed_albums:
-                print_and_log(f"    📂 {summary['album']}: {summary['downloaded']} downloaded, "
-                      f"{summary['skipped']} skipped, {summary['failed']} failed")
+            print_and_log("  ❌ Albums with failures:\n" + "\n".join(
+                f"    📂 {summary['album']}: {summary['downloaded']} downloaded, "
+                f"{summary['skipped']} skipped, {summary['failed']} failed"
+                for summary in failed_albums
+            ))
         
         # Overall totals
         print_and_log(f"\n📈 Overall totals: {total_downloaded} downloaded, {total_skipped} skipped, {total_failed} failed")
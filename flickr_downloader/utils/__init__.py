@@ -1,9 +1,11 @@
 """Utils package initialization."""
 
-from .files import load_json_file, save_json_file, format_file_size, is_video_file, sanitize_filename
+from .files import load_json_file, save_json_file, BatchedJsonCache, format_file_size, is_video_file, sanitize_filename
+from .cache_db import CacheDatabase
 from .ui import print_and_log, ProgressSpinner, create_spinner_message
 
 __all__ = [
-    'load_json_file', 'save_json_file', 'format_file_size', 'is_video_file', 'sanitize_filename',
+    'load_json_file', 'save_json_file', 'BatchedJsonCache', 'format_file_size', 'is_video_file', 'sanitize_filename',
+    'CacheDatabase',
     'print_and_log', 'ProgressSpinner', 'create_spinner_message'
 ]
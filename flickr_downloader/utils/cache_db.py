@@ -0,0 +1,160 @@
+"""
+SQLite storage for the URL cache and download progress.
+Each change is a single-row write instead of a rewrite of a whole JSON file.
+"""
+import os
+import json
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from .files import load_json_file
+
+
+class CacheDatabase:
+    """SQLite database holding the URL cache and the downloaded photo IDs.
+
+    The connection is opened on first use and shared by all threads behind a lock.
+    Data from the older url_cache.json / progress.json files is imported once
+    when the database is created.
+    """
+
+    def __init__(self, filepath, legacy_url_cache_file=None, legacy_progress_file=None,
+                 legacy_progress_log_file=None):
+        self.filepath = filepath
+        self.legacy_url_cache_file = legacy_url_cache_file
+        self.legacy_progress_file = legacy_progress_file
+        self.legacy_progress_log_file = legacy_progress_log_file
+        self._lock = threading.RLock()
+        self._conn = None
+        self.url_cache = UrlCache(self)
+        self.progress = ProgressStore(self)
+
+    def execute(self, sql, params=()):
+        """Run a statement and return all resulting rows."""
+        with self._lock:
+            return self._connection().execute(sql, params).fetchall()
+
+    def executemany(self, sql, rows):
+        """Run a statement for every row inside one transaction."""
+        with self.transaction() as conn:
+            conn.executemany(sql, rows)
+
+    @contextmanager
+    def transaction(self):
+        """Hold the lock and run the enclosed statements as one transaction."""
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def close(self):
+        """Close the connection if it was opened."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _connection(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.filepath), exist_ok=True)
+            is_new = not os.path.exists(self.filepath)
+            conn = sqlite3.connect(self.filepath, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS url_cache ("
+                "cache_key TEXT PRIMARY KEY, info TEXT NOT NULL, cached_at INTEGER NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS progress ("
+                "photo_id TEXT PRIMARY KEY, downloaded_at INTEGER NOT NULL)"
+            )
+            self._conn = conn
+            if is_new:
+                self._import_legacy_files()
+        return self._conn
+
+    def _import_legacy_files(self):
+        """Copy entries from the JSON cache files used before the database existed."""
+        now = int(time.time())
+
+        if self.legacy_url_cache_file:
+            url_cache = load_json_file(self.legacy_url_cache_file)
+            self.executemany(
+                "INSERT OR REPLACE INTO url_cache VALUES (?, ?, ?)",
+                ((key, json.dumps(info), now) for key, info in url_cache.items())
+            )
+
+        downloaded_ids = set()
+        if self.legacy_progress_file:
+            downloaded_ids.update(load_json_file(self.legacy_progress_file).get("downloaded_ids", []))
+        if self.legacy_progress_log_file and os.path.exists(self.legacy_progress_log_file):
+            with open(self.legacy_progress_log_file, "r", encoding="utf-8") as f:
+                downloaded_ids.update(line.strip() for line in f if line.strip())
+        self.executemany(
+            "INSERT OR REPLACE INTO progress VALUES (?, ?)",
+            ((photo_id, now) for photo_id in downloaded_ids)
+        )
+
+
+class UrlCache:
+    """URL cache table with the get/set interface of BatchedJsonCache."""
+
+    def __init__(self, db):
+        self.db = db
+
+    def get(self, key, default=None):
+        """Get a cached value, or default if it is not cached."""
+        rows = self.db.execute("SELECT info FROM url_cache WHERE cache_key = ?", (key,))
+        return json.loads(rows[0][0]) if rows else default
+
+    def __contains__(self, key):
+        return bool(self.db.execute("SELECT 1 FROM url_cache WHERE cache_key = ?", (key,)))
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def set(self, key, value):
+        """Store a value; it is written immediately."""
+        self.db.execute(
+            "INSERT OR REPLACE INTO url_cache VALUES (?, ?, ?)",
+            (key, json.dumps(value), int(time.time()))
+        )
+
+    def flush(self):
+        """Nothing to do: every set() is already on disk."""
+
+
+class ProgressStore:
+    """Downloaded photo IDs stored one row per ID."""
+
+    def __init__(self, db):
+        self.db = db
+
+    def load(self):
+        """Load the set of downloaded IDs."""
+        return {row[0] for row in self.db.execute("SELECT photo_id FROM progress")}
+
+    def append(self, photo_id):
+        """Record a downloaded ID."""
+        self.db.execute(
+            "INSERT OR REPLACE INTO progress VALUES (?, ?)",
+            (photo_id, int(time.time()))
+        )
+
+    def remove(self, photo_ids):
+        """Forget downloaded IDs so they are downloaded again; other rows are untouched."""
+        self.db.executemany(
+            "DELETE FROM progress WHERE photo_id = ?",
+            ((photo_id,) for photo_id in photo_ids)
+        )
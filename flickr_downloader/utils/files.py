@@ -3,24 +3,124 @@ File utilities for the Flickr downloader.
 Handles JSON file operations and file system utilities.
 """
 import os
-import re
 import json
+import threading
+from functools import lru_cache
 from ..config import config
 
+try:
+    import orjson
+except ImportError:
+    # orjson is optional; fall back to the standard library json module
+    orjson = None
+
+# File extensions of video and image files, compared against os.path.splitext(name)[1].lower()
+VIDEO_EXTENSIONS = frozenset({'.mp4', '.mov', '.avi', '.webm', '.mkv', '.flv', '.wmv'})
+IMAGE_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png', '.gif', '.webp', '.tiff'})
+
+# Suffix of a file still being downloaded; it is resumed with a Range request
+PARTIAL_SUFFIX = '.part'
+
+# (offset, bytes) signatures identifying video containers
+_VIDEO_SIGNATURES = (
+    (4, b'ftyp'),              # MP4/MOV: 'ftyp' box at offset 4
+    (4, b'moov'),              # MOV/QuickTime: 'moov' atom
+    (4, b'mdat'),              # MOV/QuickTime: 'mdat' atom
+    (0, b'\x1a\x45\xdf\xa3'),  # WebM/Matroska: EBML signature
+)
+
+# Characters that are invalid in file names on common filesystems, mapped to '_'
+_SANITIZE_TABLE = str.maketrans(dict.fromkeys('<>:"/\\|?*', '_'))
+
 
 def load_json_file(filepath):
     """Load JSON data from file if it exists, otherwise return empty dict."""
     if os.path.exists(filepath):
+        if orjson is not None:
+            with open(filepath, "rb") as f:
+                return orjson.loads(f.read())
         with open(filepath, "r", encoding="utf-8") as f:
             return json.load(f)
     return {}
 
 
-def save_json_file(filepath, data):
-    """Save data to JSON file, creating directory if needed."""
+def save_json_file(filepath, data, indent=True):
+    """Save data to JSON file, creating directory if needed.
+    
+    Large machine-read caches can pass indent=False for a compact, faster write.
+    """
     os.makedirs(os.path.dirname(filepath), exist_ok=True)
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        data_bytes = orjson.dumps(data, option=option)
+    elif indent:
+        data_bytes = json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+    else:
+        data_bytes = json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    
+    # Write to a temporary file, sync it and swap it in atomically so an
+    # interrupted run never leaves a truncated cache behind
+    tmp_path = filepath + ".tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data_bytes)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class BatchedJsonCache(dict):
+    """A dict backed by a JSON file that is rewritten in batches rather than on every change.
+    
+    Entries added with set() are flushed to disk once `flush_every` changes are
+    pending, and a background thread flushes whatever is pending every
+    `flush_interval` seconds. Call flush() at checkpoints (e.g. album
+    boundaries) and close() at exit.
+    """
+    
+    def __init__(self, filepath, flush_every=64, flush_interval=5.0):
+        super().__init__(load_json_file(filepath))
+        self.filepath = filepath
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_periodically, daemon=True)
+        self._flusher.start()
+    
+    def set(self, key, value):
+        """Store a value and flush to disk if enough changes are pending."""
+        with self._lock:
+            self[key] = value
+            self._pending += 1
+            if self._pending >= self.flush_every:
+                self._flush_locked()
+    
+    def flush(self):
+        """Write pending changes to disk."""
+        with self._lock:
+            if self._pending:
+                self._flush_locked()
+    
+    def close(self):
+        """Stop the background flusher and write any pending changes."""
+        self._closed.set()
+        self._flusher.join()
+        self.flush()
+    
+    def _flush_periodically(self):
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+    
+    def _flush_locked(self):
+        # Rewritten many times per run and never read by hand, so skip indentation
+        save_json_file(self.filepath, self, indent=False)
+        self._pending = 0
 
 
 def format_file_size(size_bytes):
@@ -39,35 +139,34 @@ def format_file_size(size_bytes):
 
 def is_video_file(filepath):
     """Check if a file is actually a video by reading its magic bytes."""
-    if not os.path.exists(filepath):
+    try:
+        st = os.stat(filepath)
+    except OSError:
         return False
-    
+    # Files unchanged since the last check are answered from the cache
+    return _is_video_header(filepath, st.st_mtime_ns, st.st_size)
+
+
+@lru_cache(maxsize=8192)
+def _is_video_header(filepath, mtime_ns, size):
+    """Check the magic bytes of a file; mtime_ns and size only key the cache."""
     try:
-        with open(filepath, 'rb') as f:
-            header = f.read(12)
-            if not header:
-                return False
-            
-            # Check for common video file signatures
-            # MP4: starts with 'ftyp' at offset 4
-            if len(header) >= 8 and header[4:8] == b'ftyp':
-                return True
-            # AVI: starts with 'RIFF' and has 'AVI ' at offset 8
-            if len(header) >= 12 and header[:4] == b'RIFF' and header[8:12] == b'AVI ':
-                return True
-            # MOV/QuickTime: similar to MP4, has 'ftyp' or 'moov'
-            if len(header) >= 8 and (header[4:8] == b'moov' or header[4:8] == b'mdat'):
-                return True
-            # WebM: starts with EBML signature
-            if header[:4] == b'\x1a\x45\xdf\xa3':
-                return True
-                
-    except Exception:
-        pass
+        fd = os.open(filepath, os.O_RDONLY)
+        try:
+            header = os.read(fd, 12)
+        finally:
+            os.close(fd)
+    except OSError:
+        return False
     
-    return False
+    # Check for common video file signatures
+    if any(header.startswith(signature, offset) for offset, signature in _VIDEO_SIGNATURES):
+        return True
+    # AVI: starts with 'RIFF' and has 'AVI ' at offset 8
+    return header.startswith(b'RIFF') and header.startswith(b'AVI ', 8)
 
 
+@lru_cache(maxsize=200_000)
 def sanitize_filename(name):
     """Sanitize filename by removing/replacing invalid characters."""
-    return re.sub(r'[<>:"/\\|?*]', '_', name)
+    return name.translate(_SANITIZE_TABLE)
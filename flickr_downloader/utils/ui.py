@@ -3,14 +3,55 @@ User interface utilities for the Flickr downloader.
 Handles progress display, logging, and user interaction.
 """
 import sys
+import queue
+import atexit
 import logging
 import os
-from datetime import datetime
+import time
+import threading
+from logging.handlers import QueueHandler, QueueListener
 from ..config import config
 
 
+# Background thread writing queued log records to the log file
+_log_listener = None
+
+# Level names accepted by print_and_log
+_LEVELS = {
+    "DEBUG": logging.DEBUG,
+    "INFO": logging.INFO,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR,
+}
+
+# Messages below this level are written to the log file only
+_console_level = _LEVELS.get(config.LOG_LEVEL, logging.INFO)
+
+# Serializes logger setup, which worker threads may trigger concurrently
+_setup_lock = threading.RLock()
+
+
+def stop_logging():
+    """Write out queued log records and stop the listener thread."""
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        for handler in _log_listener.handlers:
+            handler.close()
+        _log_listener = None
+
+
+atexit.register(stop_logging)
+
+
 def setup_logging():
     """Setup logging to both console and file."""
+    with _setup_lock:
+        return _setup_logging_locked()
+
+
+def _setup_logging_locked():
+    global _logger, _log_listener
     # Create cache directory if it doesn't exist
     os.makedirs(config.CACHE_DIR, exist_ok=True)
     
@@ -30,63 +71,83 @@ def setup_logging():
     file_handler = logging.FileHandler(config.log_file, mode='a', encoding='utf-8')
     file_handler.setFormatter(logging.Formatter('%(asctime)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S'))
     
-    # Add only file handler to our logger
-    logger.addHandler(file_handler)
+    # Worker threads only enqueue records; a listener thread formats and writes them
+    stop_logging()
+    log_queue = queue.SimpleQueue()
+    _log_listener = QueueListener(log_queue, file_handler)
+    _log_listener.start()
+    
+    # Add only the queue handler to our logger
+    logger.addHandler(QueueHandler(log_queue))
     
+    _logger = logger
     return logger
 
 
 # Initialize logger
 _logger = None
 
+# Timestamp string cache, re-formatted only when the wall-clock second changes
+_last_ts_sec = None
+_last_ts_str = ""
+
+
+def _now_str():
+    """Get the current local time as 'YYYY-MM-DD HH:MM:SS'."""
+    global _last_ts_sec, _last_ts_str
+    now_sec = int(time.time())
+    if now_sec != _last_ts_sec:
+        _last_ts_str = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(now_sec))
+        _last_ts_sec = now_sec
+    return _last_ts_str
+
 
 def get_logger():
     """Get the global logger instance."""
-    global _logger
     if _logger is None:
-        _logger = setup_logging()
+        with _setup_lock:
+            if _logger is None:
+                _setup_logging_locked()
     return _logger
 
 
 def print_and_log(message, level="INFO"):
     """Print message to console and log to file with timestamp."""
     logger = get_logger()
+    level_no = _LEVELS.get(level.upper(), logging.INFO)
     
-    # For DEBUG messages, only log to file, don't print to console to avoid clutter
-    if level.upper() != "DEBUG":
+    # Messages below LOG_LEVEL (INFO by default) only go to the file to avoid clutter
+    if level_no >= _console_level:
         # Print to console with timestamp
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        timestamp = _now_str()
         formatted_message = f"{timestamp} - {message}"
         print(formatted_message)
     
     # Log to file
-    if level.upper() == "ERROR":
-        logger.error(message)
-    elif level.upper() == "WARNING":
-        logger.warning(message)
-    elif level.upper() == "DEBUG":
-        logger.debug(message)
-    else:
-        logger.info(message)
+    logger.log(level_no, message)
 
 
 class ProgressSpinner:
-    """A rotating progress indicator."""
+    """A rotating progress indicator rendered by a background thread."""
     
-    def __init__(self, message=""):
+    def __init__(self, message="", interval=0.1):
         self.message = message
+        self.interval = interval
         self.spinner = ['⠋', '⠙', '⠹', '⠸', '⠼', '⠴', '⠦', '⠧', '⠇', '⠏']
         self.current = 0
         self.running = False
         self.last_logged_message = ""
+        self._thread = None
         
     def start(self):
         """Start showing the spinner."""
         self.running = True
         self._show()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
         
     def update(self, message=None):
-        """Update the spinner and optionally the message."""
+        """Update the spinner message; the background thread redraws it."""
         if message:
             self.message = message
             # Log progress updates periodically (every 10th album or when message changes significantly)
@@ -95,20 +156,18 @@ class ProgressSpinner:
                 if "(" in message and ")" in message:
                     album_part = message.split(")")[-1].strip()
                     if album_part != self.last_logged_message:
-                        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                        log_message = f"{timestamp} - {message}"
                         # Write to log file directly without console output
                         logger = get_logger()
                         if logger:
                             logger.info(message)
                         self.last_logged_message = album_part
-                        
-        if self.running:
-            self._show()
             
     def stop(self, final_message=None):
         """Stop the spinner and show final message."""
         self.running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
         if final_message:
             # Clear the line and use print_and_log for final message
             sys.stdout.write(f'\r{" " * 120}\r')
@@ -118,12 +177,18 @@ class ProgressSpinner:
             # Just clear the line
             sys.stdout.write(f'\r{" " * 120}\r')
             sys.stdout.flush()
+    
+    def _run(self):
+        """Redraw the spinner at a fixed rate until stopped."""
+        while self.running:
+            time.sleep(self.interval)
+            self._show()
         
     def _show(self):
         """Show the current spinner frame."""
         if self.running:
             spinner_char = self.spinner[self.current % len(self.spinner)]
-            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            timestamp = _now_str()
             message = f'{timestamp} - {spinner_char} {self.message}'
             
             # Clear the entire line first, then write the new message
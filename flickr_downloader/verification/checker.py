@@ -3,17 +3,26 @@ Verification module for the Flickr downloader.
 Handles album completion verification.
 """
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 from ..config import config
 from ..utils.ui import print_and_log
-from ..utils.files import save_json_file
+from ..utils.files import VIDEO_EXTENSIONS, PARTIAL_SUFFIX
 
 
 class AlbumVerifier:
     """Handles verification of album download completion."""
     
-    def __init__(self, api_client):
+    def __init__(self, api_client, progress_log):
         self.api_client = api_client
+        self.progress_log = progress_log
+        self.user_id = None
+    
+    def _get_user_id(self, flickr):
+        """Get the authenticated user's ID, looking it up only once."""
+        if self.user_id is None:
+            self.user_id = self.api_client.call_with_retries(flickr.test.login)['user']['id']
+        return self.user_id
     
     def verify_album_completion(self, album_title, album_id, flickr, downloaded_ids):
         """
@@ -21,14 +30,19 @@ class AlbumVerifier:
         Returns True if complete, False if missing files detected (and resets tracking).
         """
         try:
-            # Get album info from Flickr to get exact photo/video counts
-            album_info = self.api_client.call_with_retries(flickr.photosets.getInfo, photoset_id=album_id)['photoset']
+            # Get album info (exact photo/video counts) and all photo details concurrently
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                info_future = executor.submit(
+                    self.api_client.call_with_retries, flickr.photosets.getInfo, photoset_id=album_id
+                )
+                photos_future = executor.submit(
+                    self.api_client.fetch_album_photos, flickr, album_id, self._get_user_id(flickr)
+                )
+                album_info = info_future.result()['photoset']
+                album_photos = photos_future.result()
             flickr_photos = int(album_info.get('count_photos', 0))
             flickr_videos = int(album_info.get('count_videos', 0))
             
-            # Get all photo details
-            album_photos = self.api_client.fetch_album_photos(flickr, album_id, flickr.test.login()['user']['id'])
-            
             # Count what we expect to download based on settings
             expected_photos = 0
             expected_videos = 0
@@ -77,10 +91,6 @@ class AlbumVerifier:
             )
             
             if not verification_passed:
-                # Save updated progress cache after resetting tracking
-                save_json_file(config.progress_file, {"downloaded_ids": list(downloaded_ids)})
-                print_and_log(f"     Saved updated progress cache", "INFO")
-                
                 # Ask user if they want to retry
                 response = input(f"     🤔 Do you want to retry downloading missing files for '{album_title}'? (y/n): ").strip().lower()
                 if response in ['y', 'yes']:
@@ -96,15 +106,18 @@ class AlbumVerifier:
         actual_local_count = 0
         
         if os.path.exists(album_folder):
-            for filename in os.listdir(album_folder):
-                file_path = os.path.join(album_folder, filename)
-                if os.path.isfile(file_path) and os.path.getsize(file_path) > 0:
-                    # Skip video files if video downloads are disabled
-                    if not config.DOWNLOAD_VIDEO:
-                        ext = os.path.splitext(filename)[1].lower()
-                        if ext in ['.mp4', '.mov', '.avi', '.webm', '.mkv', '.flv', '.wmv']:
-                            continue
-                    actual_local_count += 1
+            # One directory read; file type and size come from the scandir entries
+            with os.scandir(album_folder) as entries:
+                for entry in entries:
+                    if entry.name.endswith(PARTIAL_SUFFIX):
+                        # Interrupted download, resumed on the next run
+                        continue
+                    if entry.is_file() and entry.stat().st_size > 0:
+                        # Skip video files if video downloads are disabled
+                        if not config.DOWNLOAD_VIDEO:
+                            if os.path.splitext(entry.name)[1].lower() in VIDEO_EXTENSIONS:
+                                continue
+                        actual_local_count += 1
         
         return actual_local_count
     
@@ -124,10 +137,16 @@ class AlbumVerifier:
             
             # Reset tracking for this album by removing all its photo IDs from downloaded_ids
             try:
-                album_photo_ids = set(photo['id'] for photo in album_photos)
-                removed_count = len(album_photo_ids.intersection(downloaded_ids))
-                downloaded_ids.difference_update(album_photo_ids)
-                print_and_log(f"     Reset tracking for {removed_count} files in {album_title}", "INFO")
+                # Collect removals while removing, instead of intersecting first
+                removed_ids = []
+                for photo in album_photos:
+                    pid = photo['id']
+                    if pid in downloaded_ids:
+                        downloaded_ids.discard(pid)
+                        removed_ids.append(pid)
+                # Only this album's rows are deleted from the progress store
+                self.progress_log.remove(removed_ids)
+                print_and_log(f"     Reset tracking for {len(removed_ids)} files in {album_title}", "INFO")
                 return False
                 
             except Exception as e: